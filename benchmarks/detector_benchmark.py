@@ -0,0 +1,77 @@
+"""
+Speed and recall of the edge/contour plate detector and the Haar cascade,
+against ground truth.
+
+Scenes come from the synthetic generator, which knows the box it drew each
+plate into. A detector finds a plate if one of its boxes overlaps the true
+box with IoU >= 0.5; recall is reported for its first box (the one the
+pipeline reads) and for any of its boxes.
+
+Usage (from the repository root):
+    python benchmarks/detector_benchmark.py --count 200 -r 3
+    python benchmarks/detector_benchmark.py --backgrounds data/images
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.contour_detector import ContourPlateDetector
+from src.model_registry import get_cascade
+from src.synthetic import SyntheticPlateGenerator
+
+PARAMS = {'scaleFactor': 1.1, 'minNeighbors': 5, 'minSize': (20, 20), 'maxSize': (300, 100)}
+
+
+def iou(a, b):
+    ax2, ay2, bx2, by2 = a[0] + a[2], a[1] + a[3], b[0] + b[2], b[1] + b[3]
+    inter = max(0, min(ax2, bx2) - max(a[0], b[0])) * max(0, min(ay2, by2) - max(a[1], b[1]))
+    return inter / float(a[2] * a[3] + b[2] * b[3] - inter)
+
+
+def time_detector(detector, images, repeats):
+    start = time.perf_counter()
+    for _ in range(repeats):
+        results = [detector.detectMultiScale(gray, **PARAMS) for gray in images]
+    return 1000 * (time.perf_counter() - start) / (repeats * len(images)), results
+
+
+def parse_resolution(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Contour detector vs Haar cascade')
+    parser.add_argument('--count', '-n', type=int, default=200, help='Synthetic scenes to detect on')
+    parser.add_argument('--repeats', '-r', type=int, default=3, help='Timing repeats per image')
+    parser.add_argument('--resolution', type=parse_resolution, default=(1280, 720), help='Scene size WxH')
+    parser.add_argument('--backgrounds', default=None, help='Directory of scene photos (default: procedural)')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    generator = SyntheticPlateGenerator(args.resolution, backgrounds=args.backgrounds, seed=args.seed)
+    images, truths = [], []
+    for _ in range(args.count):
+        image, _, (x1, y1, x2, y2) = generator.generate()
+        images.append(cv2.cvtColor(image, cv2.COLOR_BGR2GRAY))
+        truths.append((x1, y1, x2 - x1, y2 - y1))
+
+    print(f"{args.count} synthetic {args.resolution[0]}x{args.resolution[1]} scenes, one plate each\n")
+    print(f"{'detector':>8} {'ms/image':>9} {'top-1':>6} {'any':>6} {'boxes/image':>12}")
+    for name, detector in [('cascade', get_cascade()), ('contour', ContourPlateDetector())]:
+        ms, results = time_detector(detector, images, args.repeats)
+        top1 = any_hit = 0
+        for truth, boxes in zip(truths, results):
+            ious = [iou(truth, box) for box in boxes]
+            top1 += bool(ious) and ious[0] >= 0.5
+            any_hit += any(v >= 0.5 for v in ious)
+        boxes = sum(len(b) for b in results) / len(results)
+        print(f"{name:>8} {ms:>9.1f} {top1 / len(images):>6.0%} {any_hit / len(images):>6.0%} {boxes:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
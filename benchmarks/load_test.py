@@ -0,0 +1,121 @@
+"""
+Stream synthetic plate images into a directory, or straight into the
+detection pipeline, at target rates to find the sustainable throughput.
+
+With --output, images and labels.csv are written there (for later runs of
+`main.py -m process`). Otherwise each image goes through the same per-image
+path as `main.py -m process` (detection, OCR, logging against a scratch copy
+of the database, and the background image writer into a scratch directory)
+at each of --rates in turn; a rate is sustained while the stream keeps up
+with its schedule. Frames are rendered up front (--pool) and cycled, so
+generation time does not count against the pipeline.
+
+Usage (from the repository root):
+    python benchmarks/load_test.py --output data/synthetic --count 500 -r 1920x1080
+    python benchmarks/load_test.py --rates 1,2,4,8 --duration 30
+"""
+import argparse
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.synthetic import DirectorySink, FramePool, SyntheticPlateGenerator, registered_plates, stream
+
+DB_PATH = Path('database/parking.db')
+
+
+def parse_resolution(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def run_pipeline(frames, rates, duration, detector_options, output_options):
+    from main import process_one
+    from src.detector import LicensePlateDetector
+    from src.image_writer import ImageWriter
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Entries and result images from the load test must not end up in
+        # the real database and output directory
+        db_path = Path(tmp) / 'parking.db'
+        if DB_PATH.exists():
+            shutil.copy(DB_PATH, db_path)
+        detector = LicensePlateDetector(db_url=f"sqlite:///{db_path}", **detector_options)
+        writer = ImageWriter(Path(tmp) / 'detected_images', **output_options)
+
+        try:
+            for rate in rates:
+                latencies = []
+
+                def sink(index, image, plate_text, bbox):
+                    start = time.perf_counter()
+                    # The pipeline prints per image; keep the report readable
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        process_one(detector, writer, None, f"synthetic_{index:06d}.jpg", image=image)
+                    latencies.append(time.perf_counter() - start)
+
+                stats = stream(frames, sink, rate=rate, duration=duration)
+                p50, p95 = np.percentile(latencies, [50, 95]) * 1000 if latencies else (0, 0)
+                kept_up = stats['max_lag'] < 1.0
+                print(f"target {rate:6.1f}/s: achieved {stats['rate']:6.1f}/s, latency p50 {p50:6.1f} ms "
+                      f"p95 {p95:6.1f} ms, max lag {stats['max_lag']:5.1f}s "
+                      f"{'(sustained)' if kept_up else '(falling behind)'}")
+                if not kept_up:
+                    break
+        finally:
+            with contextlib.redirect_stdout(io.StringIO()):
+                writer.close()
+                detector.close()
+            writer.print_report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Synthetic plate load test')
+    parser.add_argument('--output', '-o', default=None, help='Write images here instead of running the pipeline')
+    parser.add_argument('--count', '-n', type=int, default=None, help='Images to write with --output')
+    parser.add_argument('--rates', default='1,2,4,8,16', help='Comma-separated target rates (images/sec)')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds per rate')
+    parser.add_argument('--resolution', '-r', type=parse_resolution, default=(1280, 720), help='Scene size WxH')
+    parser.add_argument('--backgrounds', default=None, help='Directory of scene photos (default: procedural)')
+    parser.add_argument('--registered', type=float, default=0.5, help='Fraction of employee plates')
+    parser.add_argument('--debounce', type=int, default=0, help='Debounce seconds for the pipeline (0 disables)')
+    parser.add_argument('--detector', choices=['cascade', 'contour'], default='cascade')
+    parser.add_argument('--output-policy', choices=['full', 'crop', 'thumbnail', 'none'], default='full',
+                        help='Result images the pipeline saves (to a scratch directory)')
+    parser.add_argument('--pool', type=int, default=32, help='Frames rendered up front for pipeline mode')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    plates = registered_plates()
+    generator = SyntheticPlateGenerator(args.resolution, plates=plates, registered_fraction=args.registered,
+                                        backgrounds=args.backgrounds, seed=args.seed)
+    rates = [float(rate) for rate in args.rates.split(',')]
+    print(f"Generating {args.resolution[0]}x{args.resolution[1]} scenes, {len(plates)} registered plates")
+
+    if args.output:
+        sink = DirectorySink(args.output)
+        try:
+            stats = stream(generator, sink, rate=rates[0] if args.count is None else None,
+                           count=args.count, duration=None if args.count else args.duration)
+        finally:
+            sink.close()
+        print(f"Wrote {stats['images']} images to {args.output} at {stats['rate']:.1f}/s "
+              f"(generation {stats['generate_seconds'] / max(1, stats['images']) * 1000:.1f} ms/image)")
+    else:
+        start = time.perf_counter()
+        frames = FramePool(generator, args.pool)
+        print(f"Rendered {args.pool} frames in {time.perf_counter() - start:.1f}s")
+        run_pipeline(frames, rates, args.duration,
+                     {'debounce_seconds': args.debounce, 'detector': args.detector},
+                     {'policy': args.output_policy})
+
+
+if __name__ == "__main__":
+    main()
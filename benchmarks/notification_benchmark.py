@@ -0,0 +1,117 @@
+"""
+Count SMS API calls for a simulated morning rush, sending one message per
+event and recipient versus coalescing into digests.
+
+Simulates vehicles arriving between 08:45 and 09:15 (some late, some
+unknown) plus a camera that fails on a run of images, queues them through
+the notification outbox and drains it with a fake SMS client. With
+--send-every the outbox is also drained during the rush, by a sender whose
+clock runs --sender-lead seconds ahead of the detector's, so errors keep
+arriving after their window's digest has been claimed. Every occurrence must
+still be counted in some digest, which is checked at the end.
+
+Usage (from the repository root):
+    python benchmarks/notification_benchmark.py --vehicles 400 --errors 200 --window 300
+    python benchmarks/notification_benchmark.py --send-every 60 --sender-lead 120
+"""
+import argparse
+import random
+import sys
+import tempfile
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import sessionmaker
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.append(str(ROOT))
+sys.path.append(str(ROOT / 'twilio-integration'))
+from setup_db import Base, EntryLog, EntryStatus
+from coalesce import AlertCoalescer
+from fake_sms import FakeSMSClient
+from outbox import OutboxMessage, OutboxSender
+
+
+def rush_events(vehicles, errors, rng):
+    """(time, kind, payload) events of a rush hour, in time order"""
+    start = (datetime.now() - timedelta(days=1)).replace(hour=8, minute=45, second=0, microsecond=0)
+    events = []
+    for i in range(vehicles):
+        at = start + timedelta(seconds=rng.uniform(0, 1800))
+        status = rng.choices([EntryStatus.ON_TIME, EntryStatus.LATE, EntryStatus.INVALID], [80, 8, 12])[0]
+        events.append((at, 'entry', (f"KA{i:02d}AB{rng.randint(1000, 9999)}", status)))
+
+    failing_from = start + timedelta(minutes=10)
+    for i in range(errors):
+        at = failing_from + timedelta(seconds=i * 3)
+        events.append((at, 'error', f"Error processing data/images/cam2_{i:05d}.jpg: Could not read image"))
+    return sorted(events, key=lambda event: event[0])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Notification coalescing benchmark')
+    parser.add_argument('--vehicles', type=int, default=400, help='Vehicles arriving in the rush')
+    parser.add_argument('--errors', type=int, default=200, help='Error notifications from a failing camera')
+    parser.add_argument('--recipients', type=int, default=3, help='Numbers notified')
+    parser.add_argument('--window', type=int, default=300, help='Digest window in seconds')
+    parser.add_argument('--send-every', type=int, default=0,
+                        help='Also drain the outbox every N simulated seconds during the rush (0: only after)')
+    parser.add_argument('--sender-lead', type=int, default=0,
+                        help='Seconds the sender\'s clock runs ahead of the detector\'s with --send-every')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    to_numbers = [f"+1555000{i:04d}" for i in range(args.recipients)]
+    events = rush_events(args.vehicles, args.errors, rng)
+    late = sum(1 for _, kind, payload in events if kind == 'entry' and payload[1] == EntryStatus.LATE)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/notify.db")
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        alerts = AlertCoalescer(to_numbers, window_seconds=args.window)
+        client = FakeSMSClient(quiet=True)
+        sender = OutboxSender(engine, client, '+15550000000')
+
+        next_send = events[0][0] + timedelta(seconds=args.send_every) if events else None
+        for at, kind, payload in events:
+            if args.send_every and at >= next_send:
+                # Only what is due at this point of the simulated rush
+                while sender.send_batch(now=at + timedelta(seconds=args.sender_lead)):
+                    pass
+                next_send = at + timedelta(seconds=args.send_every)
+            with Session.begin() as session:
+                if kind == 'entry':
+                    plate, status = payload
+                    entry = EntryLog(license_plate=plate, timestamp=at, employee_name="Unknown",
+                                     department="Unknown", status=status,
+                                     minutes_late=rng.randint(16, 40) if status == EntryStatus.LATE else None)
+                    session.add(entry)
+                    session.flush()
+                    alerts.entry(session, entry)
+                else:
+                    alerts.error(session, payload, now=at)
+
+        sender.run(once=True)
+
+        with Session() as session:
+            counted = session.scalar(select(func.sum(OutboxMessage.occurrences))
+                                     .where(OutboxMessage.signature.is_not(None))) or 0
+        engine.dispose()
+
+    per_event = len(events) * len(to_numbers)
+    print(f"\n{args.vehicles} vehicles ({late} late) and {args.errors} errors, {len(to_numbers)} recipients")
+    print(f"One SMS per event:  {per_event} API calls")
+    print(f"Coalesced ({args.window}s): {sender.stats['api_calls']} API calls "
+          f"({per_event / max(1, sender.stats['api_calls']):.0f}x fewer)")
+    alerts.print_report()
+
+    # Every error not dropped by the rate limit is in some digest, for every recipient
+    expected = (args.errors - alerts.stats['errors_dropped']) * len(to_numbers)
+    print(f"Error occurrences in digests: {counted} of {expected} expected"
+          f"{'' if counted == expected else ' - MISMATCH'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Compare saving result images synchronously with cv2.imwrite against the
+background ImageWriter under each output policy and format.
+
+Reports the time the processing loop spends per image on output (what the
+pipeline actually waits for), plus encode/IO time and size per image.
+
+Usage (from the repository root):
+    python benchmarks/output_benchmark.py -n 60 -r 1920x1080
+"""
+import argparse
+import contextlib
+import io
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.image_writer import ImageWriter
+from src.synthetic import SyntheticPlateGenerator
+
+
+def parse_resolution(value):
+    width, height = value.lower().split('x')
+    return int(width), int(height)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Result image output benchmark')
+    parser.add_argument('--images', '-n', type=int, default=60, help='Frames to save per configuration')
+    parser.add_argument('--resolution', '-r', type=parse_resolution, default=(1920, 1080))
+    parser.add_argument('--workers', type=int, default=2, help='Writer threads')
+    args = parser.parse_args()
+
+    generator = SyntheticPlateGenerator(args.resolution, seed=0)
+    frames = [generator.generate() for _ in range(args.images)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        for i, (image, _, _) in enumerate(frames):
+            cv2.imwrite(f"{tmp}/sync_{i}.jpg", image)
+        sync_ms = (time.perf_counter() - start) / len(frames) * 1000
+        print(f"{'sync imwrite full jpg':<28} loop {sync_ms:6.1f} ms/image")
+
+        configs = [('full', 'jpg', 90), ('full', 'jpg', 75), ('full', 'webp', 80),
+                   ('crop', 'jpg', 90), ('thumbnail', 'jpg', 85), ('none', 'jpg', 90)]
+        for policy, image_format, quality in configs:
+            writer = ImageWriter(Path(tmp) / f"{policy}_{image_format}_{quality}", policy, image_format, quality,
+                                 workers=args.workers)
+            start = time.perf_counter()
+            for i, (image, _, box) in enumerate(frames):
+                writer.submit(image, f"frame_{i}", box)
+            loop_ms = (time.perf_counter() - start) / len(frames) * 1000
+            writer.close()
+            total_ms = (time.perf_counter() - start) / len(frames) * 1000
+
+            s = writer.stats
+            written = max(1, s['written'])
+            print(f"{f'{policy} {image_format} q{quality}':<28} loop {loop_ms:6.1f} ms/image, "
+                  f"drained {total_ms:6.1f} ms/image, encode {s['encode_seconds'] / written * 1000:6.1f} ms, "
+                  f"write {s['write_seconds'] / written * 1000:5.2f} ms, {s['bytes'] / written / 1024:6.0f} KB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Time the bulk re-evaluation of arrival status after a schedule change, and
+check a sample of the results against the per-entry calculation.
+
+Usage (from the repository root):
+    python benchmarks/reevaluate_benchmark.py --entries 1000000 --employees 5000
+"""
+import argparse
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, time as clock
+from pathlib import Path
+
+from sqlalchemy import create_engine, update
+from sqlalchemy.orm import Session
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from setup_db import Base, Employee, EntryLog, EntryStatus, upsert_employees
+from src.arrival import arrival_status, reevaluate_arrivals
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Arrival re-evaluation benchmark')
+    parser.add_argument('--entries', '-n', type=int, default=1000000, help='Entries to re-evaluate')
+    parser.add_argument('--employees', type=int, default=5000, help='Employees on the roster')
+    parser.add_argument('--sample', type=int, default=2000, help='Entries checked against arrival_status')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/reevaluate.db")
+        Base.metadata.create_all(engine)
+
+        employees = [{
+            'name': f"Employee {i}",
+            'license_plate': f"KA{i:05d}",
+            'department': rng.choice(['IT', 'HR', 'Finance']),
+            'expected_arrival': clock(rng.choice([8, 9, 10]), rng.choice([0, 30])),
+            'grace_minutes': rng.choice([None, None, 5, 30]),
+        } for i in range(args.employees)]
+        plates = [e['license_plate'] for e in employees] + ['UNKNOWN1', 'UNKNOWN2']
+
+        start_day = datetime(2024, 1, 1, 7, 30)
+        with engine.begin() as conn:
+            upsert_employees(conn, employees)
+            for offset in range(0, args.entries, 50000):
+                conn.execute(EntryLog.__table__.insert(), [{
+                    'license_plate': rng.choice(plates),
+                    'timestamp': start_day + timedelta(days=rng.randrange(365), minutes=rng.randrange(240),
+                                                       seconds=rng.randrange(60)),
+                    'employee_name': 'Unknown', 'department': 'Unknown',
+                    'status': EntryStatus.INVALID, 'minutes_late': None,
+                } for _ in range(min(50000, args.entries - offset))])
+        print(f"Created {args.entries} entries for {args.employees} employees")
+
+        start = time.perf_counter()
+        changed = reevaluate_arrivals(engine, include_archive=False)
+        elapsed = time.perf_counter() - start
+        print(f"Full re-evaluation: {changed} changed, {args.entries / elapsed:,.0f} entries/sec")
+
+        # HR moves one department's start time; only a quarter of the year
+        with engine.begin() as conn:
+            conn.execute(update(Employee).where(Employee.department == 'IT').values(expected_arrival=clock(8, 45)))
+        start = time.perf_counter()
+        reevaluate_arrivals(engine, datetime(2024, 4, 1), datetime(2024, 7, 1), include_archive=False)
+        print(f"Quarter after schedule change: {time.perf_counter() - start:.2f}s")
+
+        with Session(engine) as session:
+            by_plate = {e.license_plate: e for e in session.query(Employee)}
+            sample = session.query(EntryLog).filter(EntryLog.timestamp >= datetime(2024, 4, 1),
+                                                    EntryLog.timestamp < datetime(2024, 7, 1)).limit(args.sample)
+            mismatches = sum(
+                (entry.status, entry.minutes_late) != arrival_status(by_plate.get(entry.license_plate), entry.timestamp)
+                for entry in sample
+            )
+        print(f"Sample check: {mismatches} mismatches against arrival_status")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
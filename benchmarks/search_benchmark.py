@@ -0,0 +1,107 @@
+"""
+Compare plate search through the trigram index with a full-table LIKE scan.
+
+Fills a scratch database with synthetic entries, builds the index, then
+times exact, partial and misread queries both ways.
+
+Usage (from the repository root):
+    python benchmarks/search_benchmark.py --entries 1000000
+"""
+import argparse
+import random
+import string
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from sqlalchemy import create_engine, text
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from setup_db import Base, EntryLog, EntryStatus
+from src.plate_search import ensure_search_index, search_entry_logs
+
+
+def random_plate(rng):
+    letters, digits = string.ascii_uppercase, string.digits
+    return (''.join(rng.choices(letters, k=2)) + ''.join(rng.choices(digits, k=2)) +
+            ''.join(rng.choices(letters, k=2)) + ''.join(rng.choices(digits, k=4)))
+
+
+def garble(plate, rng):
+    """Swap one character for a look-alike, as OCR does"""
+    confusions = {'0': 'O', 'O': '0', '1': 'I', 'I': '1', '8': 'B', 'B': '8', '5': 'S', 'S': '5'}
+    i = rng.randrange(len(plate))
+    return plate[:i] + confusions.get(plate[i], 'X') + plate[i + 1:]
+
+
+def fill(engine, entries, plates, rng, batch=50000):
+    start_time = datetime.now() - timedelta(days=365)
+    with engine.begin() as conn:
+        for offset in range(0, entries, batch):
+            rows = [{
+                'license_plate': rng.choice(plates),
+                'timestamp': start_time + timedelta(seconds=(offset + i) * 30),
+                'employee_name': None,
+                'department': None,
+                'status': EntryStatus.INVALID,
+                'minutes_late': None,
+            } for i in range(min(batch, entries - offset))]
+            conn.execute(EntryLog.__table__.insert(), rows)
+
+
+def timed(fn, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Plate search benchmark')
+    parser.add_argument('--entries', '-n', type=int, default=200000, help='Synthetic entries to search')
+    parser.add_argument('--plates', type=int, default=5000, help='Distinct plates among the entries')
+    parser.add_argument('--repeat', type=int, default=5, help='Runs per query')
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    plates = [random_plate(rng) for _ in range(args.plates)]
+    target = plates[0]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{tmp}/search.db")
+        Base.metadata.create_all(engine)
+
+        start = time.perf_counter()
+        fill(engine, args.entries, plates, rng)
+        print(f"Inserted {args.entries} entries in {time.perf_counter() - start:.1f}s (no index)")
+
+        start = time.perf_counter()
+        with engine.begin() as conn:
+            ensure_search_index(conn)
+        print(f"Built trigram index in {time.perf_counter() - start:.1f}s")
+
+        queries = {
+            'exact': target,
+            'partial': target[-4:],
+            'misread': garble(target, rng),
+        }
+        since = datetime.now() - timedelta(days=30)
+
+        with engine.connect() as conn:
+            for name, query in queries.items():
+                like_ms, like_rows = timed(lambda: conn.execute(text(
+                    "SELECT id FROM entry_logs WHERE license_plate LIKE :pattern"
+                ), {'pattern': f"%{query}%"}).all(), args.repeat)
+                index_ms, results = timed(lambda: search_entry_logs(conn, query), args.repeat)
+                recent_ms, _ = timed(lambda: search_entry_logs(conn, query, since=since), args.repeat)
+                best = results[0][1].license_plate if results else '-'
+                print(f"{name:>8} {query:<12} LIKE {like_ms:8.1f} ms ({len(like_rows)} rows) | "
+                      f"index {index_ms:6.1f} ms, last 30 days {recent_ms:6.1f} ms, best match {best}")
+
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
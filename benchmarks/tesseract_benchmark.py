@@ -0,0 +1,84 @@
+"""
+Per-plate Tesseract latency: pytesseract subprocess per plate versus the
+in-process TesseractReader, one at a time and batched.
+
+Usage (from the repository root):
+    python benchmarks/tesseract_benchmark.py -i data/images -n 50
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.tesseract_ocr import TesseractReader, pytesseract, tesserocr
+
+CASCADE_PATH = 'models/haarcascade_russian_plate_number.xml'
+
+
+def processed_plates(input_dir):
+    """Plate crops prepared the way timepass/main.py prepares them for OCR"""
+    cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    for path in sorted(Path(input_dir).glob('*.jp*g')):
+        gray = cv2.imread(str(path), cv2.IMREAD_GRAYSCALE)
+        if gray is None:
+            continue
+        plates = cascade.detectMultiScale(gray, 1.1, 4)
+        if len(plates):
+            x, y, w, h = max(plates, key=lambda rect: rect[2] * rect[3])
+            plate = cv2.resize(gray[y:y+h, x:x+w], None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+            yield cv2.adaptiveThreshold(plate, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 11, 2)
+
+
+def timed(name, plates, func):
+    start = time.perf_counter()
+    results = func(plates)
+    ms = 1000 * (time.perf_counter() - start) / len(plates)
+    print(f"{name:<28} {ms:8.1f} ms/plate   e.g. {results[0]!r}")
+    return ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tesseract backend benchmark')
+    parser.add_argument('--input', '-i', default='data/images', help='Directory of sample images')
+    parser.add_argument('--plates', '-n', type=int, default=50, help='Plates to recognise per method')
+    parser.add_argument('--tessdata', default=None, help='tessdata directory for tesserocr')
+    args = parser.parse_args()
+
+    crops = list(processed_plates(args.input))
+    if not crops:
+        print(f"No plates found in {args.input}")
+        return
+    plates = [crops[i % len(crops)] for i in range(args.plates)]
+
+    config = r'--oem 3 --psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+    subprocess_ms = None
+    if pytesseract is not None:
+        try:
+            subprocess_ms = timed('pytesseract subprocess', plates,
+                                  lambda ps: [pytesseract.image_to_string(p, config=config) for p in ps])
+        except pytesseract.TesseractNotFoundError:
+            print("tesseract executable not found: skipping the subprocess baseline")
+
+    if tesserocr is None:
+        print("tesserocr is not installed: the in-process backend cannot be measured")
+        return
+
+    reader = TesseractReader(tessdata_path=args.tessdata)
+    if reader.backend != 'tesserocr':
+        print("tesserocr could not initialise (missing tessdata?): the in-process backend cannot be measured")
+        return
+
+    single_ms = timed('in-process, one at a time', plates, lambda ps: [reader.recognize(p) for p in ps])
+    batch_ms = timed('in-process, batched', plates, reader.recognize_batch)
+    reader.close()
+
+    if subprocess_ms:
+        print(f"\nSpeedup over subprocess: {subprocess_ms / single_ms:.1f}x single, "
+              f"{subprocess_ms / batch_ms:.1f}x batched")
+
+
+if __name__ == "__main__":
+    main()
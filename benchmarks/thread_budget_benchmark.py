@@ -0,0 +1,101 @@
+"""
+Sweep splits of a core budget between worker processes, OpenCV threads and
+torch threads, and report pipeline throughput for each, to find the best
+split.
+
+Every worker process applies its ThreadBudget (OpenCV threads, torch
+threads, optional CPU pinning), runs the plate cascade over the sample
+images and reads the first plate found with EasyOCR, so OpenCV and torch
+compete for the worker's cores as in the pipeline. Without EasyOCR only
+detection runs and torch threads are not swept, which cannot show
+oversubscription between the two; the script says so when that happens.
+
+Usage (from the repository root):
+    python benchmarks/thread_budget_benchmark.py -i data/images --cores 8 --pin
+"""
+import argparse
+import importlib.util
+import multiprocessing
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.model_registry import get_cascade, get_reader
+from src.thread_budget import ThreadBudget, available_cores
+
+PARAMS = {'scaleFactor': 1.1, 'minNeighbors': 5, 'minSize': (20, 20), 'maxSize': (300, 100)}
+
+_images = None
+_ocr = False
+
+
+def init_worker(budget, counter, input_dir, ocr):
+    global _images, _ocr
+    with counter.get_lock():
+        index = counter.value
+        counter.value += 1
+    budget.apply(process_index=index)
+    get_cascade()
+    _ocr = ocr
+    if ocr:
+        get_reader(['en'], gpu=False)
+    _images = [cv2.imread(str(p), cv2.IMREAD_GRAYSCALE) for p in sorted(Path(input_dir).glob('*.jp*g'))]
+
+
+def process(index):
+    gray = _images[index % len(_images)]
+    plates = get_cascade().detectMultiScale(gray, **PARAMS)
+    if _ocr and len(plates):
+        x, y, w, h = plates[0]
+        get_reader(['en'], gpu=False).readtext(gray[y:y+h, x:x+w])
+    return len(plates)
+
+
+def run(budget, input_dir, images, ocr):
+    counter = multiprocessing.Value('i', 0)
+    with multiprocessing.Pool(budget.processes, initializer=init_worker,
+                              initargs=(budget, counter, input_dir, ocr)) as pool:
+        pool.map(process, range(budget.processes))  # warm up
+        start = time.perf_counter()
+        pool.map(process, range(images), chunksize=1)
+        return images / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Thread budget sweep')
+    parser.add_argument('--input', '-i', default='data/images', help='Directory of sample images')
+    parser.add_argument('--cores', type=int, default=None, help='Core budget to split (default: all)')
+    parser.add_argument('--images', '-n', type=int, default=120, help='Images per configuration')
+    parser.add_argument('--pin', action='store_true', help='Pin each worker to its cores')
+    args = parser.parse_args()
+
+    cores = args.cores or available_cores()
+    process_counts = sorted({1, 2, 4, cores} & set(range(1, cores + 1)) | {p for p in (8, 16, 32) if p <= cores})
+
+    ocr = importlib.util.find_spec('easyocr') is not None and importlib.util.find_spec('torch') is not None
+    if not ocr:
+        print("EasyOCR/torch is not installed: timing detection only and not sweeping torch threads,\n"
+              "so this run cannot show oversubscription between OpenCV and torch\n")
+
+    results = []
+    for processes in process_counts:
+        per_process = max(1, cores // processes)
+        for opencv_threads in sorted({1, per_process}):
+            for torch_threads in sorted({1, per_process}) if ocr else [None]:
+                budget = ThreadBudget(cores=cores, processes=processes, opencv_threads=opencv_threads,
+                                      torch_threads=torch_threads, pin=args.pin)
+                rate = run(budget, args.input, args.images, ocr)
+                results.append((rate, budget))
+                torch_part = f" x {torch_threads:>2} torch threads" if ocr else ""
+                print(f"{processes:>3} processes x {opencv_threads:>2} OpenCV threads{torch_part}: "
+                      f"{rate:7.1f} images/sec")
+
+    rate, best = max(results, key=lambda r: r[0])
+    print(f"\nBest for {cores} cores: {best.describe()} ({rate:.1f} images/sec)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Compare full-frame detection with tiled, multi-threaded detection on large frames.
+
+Sample images are laid out on a large canvas (4K by default) to mimic a
+multi-lane camera. Tiled boxes are checked against the full-frame result.
+
+Usage (from the repository root):
+    python benchmarks/tiling_benchmark.py -i data/images -r 3840x2160 -n 5
+"""
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.tiling import TiledDetector
+
+CASCADE_PATH = 'models/haarcascade_russian_plate_number.xml'
+
+
+def mosaic(images, width, height, rng):
+    """Scatter the sample images over a blank canvas of the given size"""
+    canvas = np.full((height, width), 90, dtype=np.uint8)
+    for image in images:
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape
+        if w >= width or h >= height:
+            continue
+        x = int(rng.integers(0, width - w))
+        y = int(rng.integers(0, height - h))
+        canvas[y:y+h, x:x+w] = gray
+    return canvas
+
+
+def iou(a, b):
+    ax2, ay2, bx2, by2 = a[0] + a[2], a[1] + a[3], b[0] + b[2], b[1] + b[3]
+    inter = max(0, min(ax2, bx2) - max(a[0], b[0])) * max(0, min(ay2, by2) - max(a[1], b[1]))
+    return inter / float(a[2] * a[3] + b[2] * b[3] - inter)
+
+
+def agreement(reference, boxes):
+    """Fraction of full-frame boxes that the tiled detector also found (IoU >= 0.5)"""
+    if len(reference) == 0:
+        return 1.0
+    found = sum(1 for ref in reference if any(iou(ref, box) >= 0.5 for box in boxes))
+    return found / len(reference)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Tiled detection benchmark')
+    parser.add_argument('--input', '-i', default='data/images', help='Directory of sample images')
+    parser.add_argument('--resolution', '-r', default='3840x2160', help='Canvas size WIDTHxHEIGHT')
+    parser.add_argument('--frames', '-n', type=int, default=5, help='Frames per configuration')
+    args = parser.parse_args()
+
+    images = [cv2.imread(str(p)) for p in sorted(Path(args.input).glob('*.jp*g'))]
+    images = [img for img in images if img is not None]
+    if not images:
+        print(f"No images found in {args.input}")
+        return
+
+    width, height = (int(v) for v in args.resolution.lower().split('x'))
+    rng = np.random.default_rng(0)
+    frames = [mosaic(images, width, height, rng) for _ in range(args.frames)]
+
+    cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    start = time.perf_counter()
+    reference = [cascade.detectMultiScale(f, scaleFactor=1.1, minNeighbors=5,
+                                          minSize=(20, 20), maxSize=(300, 100)) for f in frames]
+    full_ms = 1000 * (time.perf_counter() - start) / len(frames)
+    print(f"{'full frame':<12} {full_ms:9.1f} ms/frame")
+
+    cores = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, cores} | set(range(8, cores + 1, 8)))
+    for workers in worker_counts:
+        detector = TiledDetector(workers=workers)
+        detector.detect(frames[0])  # load per-thread cascades before timing
+        start = time.perf_counter()
+        results = [detector.detect(f) for f in frames]
+        tiled_ms = 1000 * (time.perf_counter() - start) / len(frames)
+        detector.close()
+
+        match = np.mean([agreement(ref, boxes) for ref, boxes in zip(reference, results)])
+        print(f"{f'{workers} workers':<12} {tiled_ms:9.1f} ms/frame  "
+              f"speedup {full_ms / tiled_ms:4.1f}x  agreement with full frame {match:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Compare the old fixed 2x cubic upscale before OCR with size-aware
+normalisation to a target character height, across crop sizes.
+
+Plate crops are cut from synthetic scenes at their known bounding boxes,
+so every crop has a ground-truth plate string, and rescaled to several
+sizes. For each size the benchmark reports the pixels handed to OCR and, if
+EasyOCR is installed, OCR latency and accuracy: the share of crops read
+exactly as the ground truth, and the share of ground-truth characters read
+correctly.
+
+Usage (from the repository root):
+    python benchmarks/upscale_benchmark.py --count 60
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import cv2
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.consensus import align
+from src.preprocess import PreprocessPipeline
+from src.synthetic import SyntheticPlateGenerator
+
+SCALES = [0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0]
+
+
+def plate_crops(generator, count):
+    """(grayscale crop, plate_text) at the generated plate's bounding box"""
+    for _ in range(count):
+        image, plate_text, (x1, y1, x2, y2) = generator.generate()
+        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        yield gray[y1:y2, x1:x2].copy(), plate_text
+
+
+def char_accuracy(truth, text):
+    """Share of ground-truth characters read correctly, after alignment"""
+    return sum(a == b for a, b in zip(truth, align(truth, text))) / len(truth)
+
+
+def clean(results):
+    if not results:
+        return ''
+    text = max(results, key=lambda r: r[2])[1]
+    return ''.join(c for c in text if c.isalnum()).upper()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='OCR upscaling benchmark')
+    parser.add_argument('--count', '-n', type=int, default=60, help='Synthetic plates to read')
+    parser.add_argument('--char-height', type=int, default=40, help='Target character height in pixels')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    # Mild degradation: the crop sizes, not the image quality, are under test
+    generator = SyntheticPlateGenerator(max_blur=1, noise_sigma=(0, 4), seed=args.seed)
+    crops, truths = zip(*plate_crops(generator, args.count))
+
+    try:
+        import easyocr
+        reader = easyocr.Reader(['en'])
+    except ImportError:
+        reader = None
+        print("EasyOCR is not installed: reporting pixel counts only\n")
+
+    pipeline = PreprocessPipeline(target_char_height=args.char_height)
+    methods = {
+        'fixed 2x': lambda crop: cv2.resize(crop, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC),
+        'adaptive': lambda crop: pipeline.normalize_for_ocr(crop).copy(),
+    }
+
+    print(f"{'scale':>6} {'crop h':>7} {'method':>9} {'kpixels':>8} {'ms/crop':>8} {'exact':>6} {'chars':>6}")
+    for scale in SCALES:
+        scaled = [cv2.resize(c, None, fx=scale, fy=scale,
+                             interpolation=cv2.INTER_AREA if scale < 1 else cv2.INTER_CUBIC) for c in crops]
+        mean_h = sum(c.shape[0] for c in scaled) / len(scaled)
+        for name, method in methods.items():
+            inputs = [method(c) for c in scaled]
+            kpixels = sum(i.size for i in inputs) / len(inputs) / 1000
+            if reader is None:
+                print(f"{scale:>6} {mean_h:>7.0f} {name:>9} {kpixels:>8.1f} {'-':>8} {'-':>6} {'-':>6}")
+                continue
+            start = time.perf_counter()
+            texts = [clean(reader.readtext(i)) for i in inputs]
+            ms = 1000 * (time.perf_counter() - start) / len(inputs)
+            exact = sum(t == truth for t, truth in zip(texts, truths)) / len(texts)
+            chars = sum(char_accuracy(truth, t) for t, truth in zip(texts, truths)) / len(texts)
+            print(f"{scale:>6} {mean_h:>7.0f} {name:>9} {kpixels:>8.1f} {ms:>8.1f} {exact:>6.0%} {chars:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
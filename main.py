@@ -1,15 +1,38 @@
 import argparse
 import cv2
+import time as timer
 from pathlib import Path
 from datetime import datetime, timedelta
 from src.detector import LicensePlateDetector
-from setup_db import EntryLog
+from src import model_registry
+from src.consensus import ConsensusTracker
+from src.retention import query_entry_logs, rotate_entry_logs
+from src.plate_search import search_entry_logs
+from src.arrival import DEFAULT_GRACE_MINUTES, reevaluate_arrivals
+from src.thread_budget import ThreadBudget
+from src.image_writer import ImageWriter, POLICIES, FORMATS
+from src.profiling import PipelineProfiler, MODES as PROFILE_MODES
+from setup_db import upgrade_schema, import_roster
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
 
-def process_images(input_dir):
+def process_one(detector, writer, profiler, image_path, image=None):
+    """Run one image through the pipeline and queue its result image for writing"""
+    if profiler:
+        with profiler.image(image_path, lambda: detector.last_stages):
+            result_image = detector.process_image(image_path, annotate=writer.policy != 'none', image=image)
+    else:
+        result_image = detector.process_image(image_path, annotate=writer.policy != 'none', image=image)
+
+    if result_image is not None:
+        writer.submit(result_image, Path(image_path).name, detector.last_box)
+
+def process_images(input_dir, output_options=None, profile_options=None, **detector_options):
     """Process all images in the input directory"""
-    detector = LicensePlateDetector()
+    detector = LicensePlateDetector(**detector_options)
+    model_registry.print_load_times()
+    # Annotated results are encoded and saved on background threads
+    writer = ImageWriter('data/detected_images', **(output_options or {}))
+    profiler = PipelineProfiler(**profile_options) if profile_options else None
 
     try:
         input_path = Path(input_dir)
@@ -17,10 +40,6 @@ def process_images(input_dir):
             print(f"Error: Directory {input_dir} does not exist")
             return
 
-        # Create detected_images directory in data folder
-        detected_path = Path('data/detected_images')
-        detected_path.mkdir(parents=True, exist_ok=True)
-
         image_files = list(input_path.glob('*.jpg')) + list(input_path.glob('*.jpeg'))
         if not image_files:
             print(f"No images found in {input_dir}")
@@ -30,29 +49,77 @@ def process_images(input_dir):
 
         for image_path in image_files:
             print(f"\nProcessing {image_path.name}...")
-            result_image = detector.process_image(image_path)
+            process_one(detector, writer, profiler, image_path)
+
+    finally:
+        writer.close()
+        writer.print_report()
+        if profiler:
+            profiler.print_report(profiler.close())
+        detector.close()
 
-            if result_image is not None:
-                # Save result image with timestamp
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                output_path = detected_path / f"detected_{timestamp}_{image_path.name}"
-                cv2.imwrite(str(output_path), result_image)
+def process_video(source, threshold=0.75, **detector_options):
+    """Process a video file or camera stream, logging one entry per vehicle"""
+    detector = LicensePlateDetector(**detector_options)
+    model_registry.print_load_times()
+
+    def on_decision(plate_number, score):
+        employee = detector.find_employee(plate_number)
+        entry = detector.log_entry(plate_number, employee)
+        if entry is None:
+            return
+        print(f"\nEntry logged:")
+        print(f"Employee: {entry.employee_name}")
+        print(f"Plate: {plate_number} (consensus {score:.2f})")
+        print(f"Time: {entry.timestamp}")
+        print(f"Status: {entry.status.value}")
+        if entry.minutes_late:
+            print(f"Minutes Late: {entry.minutes_late}")
+
+    tracker = ConsensusTracker(on_decision, threshold=threshold)
+
+    # A numeric source is a camera index
+    cap = cv2.VideoCapture(int(source) if str(source).isdigit() else str(source))
+    try:
+        if not cap.isOpened():
+            print(f"Error: Could not open video source {source}")
+            return
+
+        while True:
+            ret, frame = cap.read()
+            if not ret:
+                break
+
+            plate_region, coords = detector.detect_plate(frame)
+            if plate_region is None:
+                tracker.observe(False)
+            elif tracker.wants_ocr():
+                plate_number, confidence = detector.read_plate_scored(plate_region)
+                tracker.observe(True, plate_number, confidence)
+            else:
+                tracker.observe(True)
+
+        # Decide on the vehicle still in view when the stream ends
+        tracker.finish()
+
+        stats = tracker.stats
+        print(f"\nFrames: {stats['frames']}, vehicles: {stats['vehicles']}, "
+              f"OCR calls: {stats['ocr_calls']} ({tracker.ocr_per_vehicle:.1f} per vehicle, "
+              f"{stats['early_exits']} early exits)")
 
     finally:
+        cap.release()
         detector.close()
 
 def view_recent_logs(hours=24):
     """View recent entry logs from the database"""
     engine = create_engine('sqlite:///database/parking.db')
-    Session = sessionmaker(bind=engine)
-    session = Session()
+    conn = engine.connect()
 
     try:
+        # Includes archived months if the range reaches past the hot window
         time_threshold = datetime.now() - timedelta(hours=hours)
-        entries = session.query(EntryLog)\
-            .filter(EntryLog.timestamp >= time_threshold)\
-            .order_by(EntryLog.timestamp.desc())\
-            .all()
+        entries = query_entry_logs(conn, time_threshold)
 
         if not entries:
             print(f"No entries found in the last {hours} hours")
@@ -71,27 +138,213 @@ def view_recent_logs(hours=24):
             print("-" * 80)
 
     finally:
-        session.close()
+        conn.close()
+
+def search_logs(plate, hours=None, limit=20):
+    """Search entry logs for a partial or misread plate"""
+    engine = create_engine('sqlite:///database/parking.db')
+    upgrade_schema(engine)
+    conn = engine.connect()
+
+    try:
+        since = datetime.now() - timedelta(hours=hours) if hours else None
+        start = timer.perf_counter()
+        results = search_entry_logs(conn, plate, since=since, limit=limit)
+        conn.commit()  # Keeps the index if this search created it
+        elapsed = (timer.perf_counter() - start) * 1000
+
+        window = f" in the last {hours} hours" if hours else ""
+        if not results:
+            print(f"No entries matching '{plate}'{window} ({elapsed:.1f} ms)")
+            return
+
+        print(f"\n{len(results)} entries matching '{plate}'{window} ({elapsed:.1f} ms):")
+        print("-" * 80)
+        for score, entry in results:
+            status = entry.status.value if entry.status else '-'
+            print(f"{score:4.0%}  {entry.license_plate:<12} {entry.timestamp}  "
+                  f"{entry.employee_name or 'Unknown'}  {status}")
+
+    finally:
+        conn.close()
+
+def reevaluate_logs(since=None, until=None, grace=DEFAULT_GRACE_MINUTES):
+    """Recompute arrival status of logged entries from the current schedules"""
+    engine = create_engine('sqlite:///database/parking.db')
+    try:
+        upgrade_schema(engine)
+        reevaluate_arrivals(engine, since, until, default_grace=grace)
+    finally:
+        engine.dispose()
+
+def archive_logs(hot_days=30):
+    """Move entries older than the hot window into the monthly archive"""
+    engine = create_engine('sqlite:///database/parking.db')
+    try:
+        rotate_entry_logs(engine, hot_days=hot_days)
+    finally:
+        engine.dispose()
 
 def main():
     parser = argparse.ArgumentParser(description='License Plate Detection System')
     parser.add_argument('--mode', '-m',
-                       choices=['process', 'view'],
+                       choices=['process', 'video', 'view', 'search', 'import-roster', 'reevaluate', 'archive'],
                        default='process',
-                       help='Mode: process images or view recent logs')
+                       help='Mode: process images, process a video, view recent logs, search logs by plate, '
+                            'import an employee roster, re-evaluate arrival status or archive old logs')
     parser.add_argument('--input', '-i',
                        default='data/images',
-                       help='Input directory containing images')
+                       help='Input directory containing images, video file/camera index in video mode, '
+                            'or CSV/JSON roster file in import-roster mode')
     parser.add_argument('--hours', '-hr',
                        type=int,
                        default=24,
-                       help='Hours of logs to view')
+                       help='Hours of logs to view or search (0 searches all entries, archived months included)')
+    parser.add_argument('--plate', '-p',
+                       default=None,
+                       help='Full, partial or misread plate to look for (search mode)')
+    parser.add_argument('--limit',
+                       type=int,
+                       default=20,
+                       help='Maximum number of search results')
+    parser.add_argument('--consensus', '-t',
+                       type=float,
+                       default=0.75,
+                       help='Consensus score at which to stop reading a vehicle\'s plate (video mode)')
+    parser.add_argument('--debounce', '-d',
+                       type=int,
+                       default=300,
+                       help='Seconds during which repeated sightings of a plate are not logged again (0 disables)')
+    parser.add_argument('--chunk-size',
+                       type=int,
+                       default=5000,
+                       help='Rows per transaction when importing a roster')
+    parser.add_argument('--since',
+                       type=datetime.fromisoformat,
+                       default=None,
+                       help='Start date (YYYY-MM-DD) of entries to re-evaluate (default: all)')
+    parser.add_argument('--until',
+                       type=datetime.fromisoformat,
+                       default=None,
+                       help='End date (YYYY-MM-DD, exclusive) of entries to re-evaluate')
+    parser.add_argument('--grace',
+                       type=int,
+                       default=DEFAULT_GRACE_MINUTES,
+                       help='Grace period in minutes for employees without their own (process, video and reevaluate)')
+    parser.add_argument('--hot-days',
+                       type=int,
+                       default=30,
+                       help='Days of entries kept in the main table when archiving')
+    parser.add_argument('--tile-workers',
+                       type=int,
+                       default=0,
+                       help='Detect on overlapping tiles with this many threads (for 4K/panoramic frames, 0 disables)')
+    parser.add_argument('--quality-threshold', '-q',
+                       type=float,
+                       default=0.5,
+                       help='Minimum plate crop quality score (0-1) to run OCR on (0 disables the gate)')
+    parser.add_argument('--detector',
+                       choices=['cascade', 'contour'],
+                       default='cascade',
+                       help='Plate detector for this camera: Haar cascade or edge/contour based')
+    parser.add_argument('--output-policy',
+                       choices=POLICIES,
+                       default='full',
+                       help='Result images to save: full annotated frame, plate crop, thumbnail or none')
+    parser.add_argument('--output-format',
+                       choices=FORMATS,
+                       default='jpg',
+                       help='Encoding of saved result images')
+    parser.add_argument('--output-quality',
+                       type=int,
+                       default=90,
+                       help='JPEG/WebP quality of saved result images (1-100)')
+    parser.add_argument('--writer-workers',
+                       type=int,
+                       default=2,
+                       help='Threads encoding and writing result images')
+    parser.add_argument('--profile',
+                       choices=PROFILE_MODES,
+                       default=None,
+                       help='Profile image processing: stage timings only, stack sampling (collapsed stacks '
+                            'for flamegraphs) or cProfile; writes to data/profiles')
+    parser.add_argument('--profile-fraction',
+                       type=float,
+                       default=0.05,
+                       help='Fraction of images to profile, to bound the overhead in production (1 profiles all)')
+    parser.add_argument('--slow-log',
+                       type=int,
+                       default=10,
+                       help='Number of slowest images to report with their stage breakdown')
+    parser.add_argument('--camera', '-c',
+                       default=None,
+                       help='Fixed camera ID; learns and persists a detection ROI for it')
+    parser.add_argument('--cores',
+                       type=int,
+                       default=None,
+                       help='Cores available to this detector (default: all cores it may run on)')
+    parser.add_argument('--opencv-threads',
+                       type=int,
+                       default=None,
+                       help='OpenCV threads (default: derived from --cores and --tile-workers)')
+    parser.add_argument('--torch-threads',
+                       type=int,
+                       default=None,
+                       help='Torch intra-op threads for EasyOCR (default: --cores)')
+    parser.add_argument('--pin',
+                       action='store_true',
+                       help='Pin the process to its cores')
 
     args = parser.parse_args()
 
+    # Tiling only applies to full-frame cascade detection
+    if args.tile_workers and args.camera:
+        parser.error("--tile-workers cannot be combined with --camera (ROI detection does not tile)")
+    if args.tile_workers and args.detector == 'contour':
+        parser.error("--tile-workers needs --detector cascade (the contour detector does not tile)")
+
+    detector_options = {
+        'camera_id': args.camera,
+        'debounce_seconds': args.debounce,
+        'tile_workers': args.tile_workers,
+        'quality_threshold': args.quality_threshold,
+        'detector': args.detector,
+        'grace_minutes': args.grace,
+        'thread_budget': ThreadBudget(cores=args.cores, tile_workers=args.tile_workers,
+                                      opencv_threads=args.opencv_threads,
+                                      torch_threads=args.torch_threads, pin=args.pin),
+    }
+
     if args.mode == 'process':
         print(f"Processing images from: {args.input}")
-        process_images(args.input)
+        output_options = {
+            'policy': args.output_policy,
+            'image_format': args.output_format,
+            'quality': args.output_quality,
+            'workers': args.writer_workers,
+        }
+        profile_options = None
+        if args.profile:
+            profile_options = {'mode': args.profile, 'fraction': args.profile_fraction, 'slow_log': args.slow_log,
+                               'camera_id': args.camera}
+        process_images(args.input, output_options, profile_options, **detector_options)
+    elif args.mode == 'video':
+        print(f"Processing video from: {args.input}")
+        process_video(args.input, args.consensus, **detector_options)
+    elif args.mode == 'import-roster':
+        print(f"Importing roster from: {args.input}")
+        try:
+            import_roster(args.input, args.chunk_size)
+        except (OSError, ValueError) as e:
+            print(f"Error importing roster: {e}")
+    elif args.mode == 'search':
+        if not args.plate:
+            parser.error("search mode needs --plate")
+        search_logs(args.plate, args.hours, args.limit)
+    elif args.mode == 'reevaluate':
+        reevaluate_logs(args.since, args.until, args.grace)
+    elif args.mode == 'archive':
+        archive_logs(args.hot_days)
     else:
         view_recent_logs(args.hours)
 
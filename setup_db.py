@@ -1,11 +1,28 @@
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Time, Enum
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Time, Enum, inspect, text
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 from datetime import time
+from pathlib import Path
+import csv
 import enum
+import json
+import time as timer
+
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# JSON arrays are parsed whole unless ijson is installed; larger files must
+# be JSON Lines or CSV, which are always streamed
+MAX_JSON_ARRAY_BYTES = 50 * 1024 * 1024
 
 Base = declarative_base()
 
+class BlankPlateError(ValueError):
+    """Roster record without a usable license plate"""
+
 class EntryStatus(enum.Enum):
     ON_TIME = "ON TIME"
     LATE = "LATE"
@@ -19,24 +36,153 @@ class Employee(Base):
     license_plate = Column(String(20), unique=True, nullable=False)
     department = Column(String(50))
     expected_arrival = Column(Time, nullable=False)  # Expected arrival time
+    grace_minutes = Column(Integer, nullable=True)   # Overrides the default grace period if set
 
 class EntryLog(Base):
     __tablename__ = 'entry_logs'
 
     id = Column(Integer, primary_key=True)
     license_plate = Column(String(20))
-    timestamp = Column(DateTime)
+    timestamp = Column(DateTime, index=True)
     employee_name = Column(String(100))
     department = Column(String(50))
     status = Column(Enum(EntryStatus))
     minutes_late = Column(Integer, nullable=True)
 
+def upgrade_schema(engine):
+    """
+    Create missing tables and add columns introduced since a table was
+    created (SQLite can add nullable columns in place)
+    """
+    Base.metadata.create_all(engine)
+    inspector = inspect(engine)
+    with engine.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            existing = {column['name'] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name not in existing and column.nullable:
+                    column_type = column.type.compile(dialect=engine.dialect)
+                    conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                    print(f"Added column {table.name}.{column.name}")
+
+def upsert_employees(conn, rows, update_existing=True):
+    """
+    Insert employee rows (dicts) with a single INSERT ... ON CONFLICT on
+    license_plate. Existing employees are updated unless update_existing is False.
+    """
+    stmt = insert(Employee.__table__)
+    if update_existing:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['license_plate'],
+            set_={
+                'name': stmt.excluded.name,
+                'department': stmt.excluded.department,
+                'expected_arrival': stmt.excluded.expected_arrival,
+                'grace_minutes': stmt.excluded.grace_minutes,
+            }
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=['license_plate'])
+    conn.execute(stmt, rows)
+
+def read_roster(path):
+    """
+    Stream roster records from a CSV, JSON Lines (.jsonl) or JSON array file.
+    JSON arrays are streamed with ijson if it is installed; otherwise they
+    are loaded whole, up to MAX_JSON_ARRAY_BYTES.
+    """
+    path = Path(path)
+    suffix = path.suffix.lower()
+    if suffix not in ('.csv', '.jsonl') and ijson is not None:
+        with open(path, 'rb') as f:
+            yield from ijson.items(f, 'item')
+        return
+    if suffix not in ('.csv', '.jsonl') and path.stat().st_size > MAX_JSON_ARRAY_BYTES:
+        raise ValueError(f"{path} is too large to load as a JSON array: "
+                         f"convert it to JSON Lines (.jsonl) or CSV, or install ijson")
+
+    with open(path, newline='', encoding='utf-8') as f:
+        if suffix == '.csv':
+            yield from csv.DictReader(f)
+        elif suffix == '.jsonl':
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from json.load(f)
+
+def roster_row(record):
+    """Convert a roster record to an employees row"""
+    plate = ''.join(c for c in str(record['license_plate'] or '') if c.isalnum()).upper()
+    if not plate:
+        raise BlankPlateError("blank license_plate")
+    expected = record.get('expected_arrival') or '09:00'
+    grace = record.get('grace_minutes')
+    return {
+        'name': record['name'].strip(),
+        'license_plate': plate,
+        'department': (record.get('department') or '').strip() or None,
+        'expected_arrival': expected if isinstance(expected, time) else time.fromisoformat(str(expected).strip()),
+        'grace_minutes': int(grace) if grace not in (None, '') else None,
+    }
+
+def import_roster(path, chunk_size=5000, db_url='sqlite:///database/parking.db'):
+    """
+    Upsert an employee roster in chunks, one transaction per chunk.
+    Fields: name, license_plate, department, expected_arrival (HH:MM) and
+    optionally grace_minutes. Returns the number of rows imported.
+    """
+    engine = create_engine(db_url)
+    upgrade_schema(engine)
+
+    imported = 0
+    skipped = 0
+    blank_plates = 0
+    start = timer.perf_counter()
+
+    def flush(chunk):
+        with engine.begin() as conn:
+            upsert_employees(conn, chunk)
+
+    chunk = []
+    for line_number, record in enumerate(read_roster(path), start=1):
+        try:
+            chunk.append(roster_row(record))
+        except (KeyError, ValueError, AttributeError) as e:
+            skipped += 1
+            blank_plates += isinstance(e, BlankPlateError)
+            print(f"Skipping roster record {line_number}: {e}")
+            continue
+
+        if len(chunk) >= chunk_size:
+            flush(chunk)
+            imported += len(chunk)
+            chunk = []
+            elapsed = timer.perf_counter() - start
+            print(f"Imported {imported} rows ({imported / elapsed:.0f} rows/sec)")
+
+    if chunk:
+        flush(chunk)
+        imported += len(chunk)
+
+    elapsed = timer.perf_counter() - start
+    rate = imported / elapsed if elapsed else 0
+    print(f"Roster import complete: {imported} rows in {elapsed:.2f}s ({rate:.0f} rows/sec), "
+          f"{skipped} skipped ({blank_plates} with a blank license plate)")
+    engine.dispose()
+    return imported
+
 def init_database():
     # Create database engine (SQLite)
     engine = create_engine('sqlite:///database/parking.db', echo=True)
 
-    # Create all tables
-    Base.metadata.create_all(engine)
+    # Create all tables (and columns added since the database was created)
+    upgrade_schema(engine)
+
+    # Trigram index for plate search, kept up to date by triggers
+    from src.plate_search import ensure_search_index
+    with engine.begin() as conn:
+        ensure_search_index(conn)
 
     # Create session
     Session = sessionmaker(bind=engine)
@@ -80,12 +226,17 @@ def init_database():
         ),
     ]
 
-    # Add employees to database
-    for employee in sample_employees:
-        # Check if employee already exists
-        existing = session.query(Employee).filter_by(license_plate=employee.license_plate).first()
-        if not existing:
-            session.add(employee)
+    # Add employees that do not exist yet in a single statement
+    upsert_employees(session.connection(), [
+        {
+            'name': employee.name,
+            'license_plate': employee.license_plate,
+            'department': employee.department,
+            'expected_arrival': employee.expected_arrival,
+            'grace_minutes': employee.grace_minutes,
+        }
+        for employee in sample_employees
+    ], update_existing=False)
 
     # Commit changes
     session.commit()
@@ -0,0 +1,119 @@
+import time as timer
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import text
+
+from setup_db import EntryStatus
+from src.retention import ARCHIVE_PATH, TIMESTAMP_FORMAT, attach_archive, archive_months, archive_table_name
+
+DEFAULT_GRACE_MINUTES = 15
+
+
+def grace_for(employee, default_grace=DEFAULT_GRACE_MINUTES):
+    grace = getattr(employee, 'grace_minutes', None)
+    return default_grace if grace is None else grace
+
+
+def arrival_status(employee, entry_time, default_grace=DEFAULT_GRACE_MINUTES):
+    """
+    Check arrival status compared to expected time
+    Returns: (status, minutes_late)
+    """
+    if not employee:
+        return EntryStatus.INVALID, None
+
+    entry_time = entry_time.time()
+    expected_time = employee.expected_arrival
+
+    # Convert times to minutes since midnight for comparison
+    entry_minutes = entry_time.hour * 60 + entry_time.minute
+    expected_minutes = expected_time.hour * 60 + expected_time.minute
+
+    minutes_late = entry_minutes - expected_minutes
+    if minutes_late <= grace_for(employee, default_grace):
+        return EntryStatus.ON_TIME, 0
+    return EntryStatus.LATE, minutes_late
+
+
+# Same arithmetic as arrival_status, on the text SQLAlchemy stores in SQLite:
+# timestamps as 'YYYY-MM-DD HH:MM:SS.ffffff', times as 'HH:MM:SS.ffffff'
+_SCHEDULES = """
+    SELECT license_plate, name, department,
+           CAST(substr(expected_arrival, 1, 2) AS INTEGER) * 60
+               + CAST(substr(expected_arrival, 4, 2) AS INTEGER) AS expected_minutes,
+           coalesce(grace_minutes, :default_grace) AS grace
+    FROM main.employees
+"""
+
+_LATE = ("(CAST(substr({t}.timestamp, 12, 2) AS INTEGER) * 60 + CAST(substr({t}.timestamp, 15, 2) AS INTEGER)"
+         " - s.expected_minutes)")
+
+
+def _reevaluate_table(conn, table, where, params):
+    """Recompute status for one log table. Returns the number of rows changed"""
+    name = table.split('.')[-1]
+    late = _LATE.format(t=name)
+    status = f"CASE WHEN {late} > s.grace THEN 'LATE' ELSE 'ON_TIME' END"
+    minutes = f"CASE WHEN {late} > s.grace THEN {late} ELSE 0 END"
+
+    # Entries of known employees: one UPDATE joined to the schedules, only
+    # writing rows whose values actually change
+    matched = conn.execute(text(f"""
+        UPDATE {table}
+        SET status = {status}, minutes_late = {minutes},
+            employee_name = s.name, department = s.department
+        FROM ({_SCHEDULES}) AS s
+        WHERE {name}.license_plate = s.license_plate AND {where}
+          AND ({name}.status IS NOT {status} OR {name}.minutes_late IS NOT {minutes}
+               OR {name}.employee_name IS NOT s.name OR {name}.department IS NOT s.department)
+    """), params).rowcount
+
+    # Plates no longer (or never) on the roster
+    unmatched = conn.execute(text(f"""
+        UPDATE {table}
+        SET status = 'INVALID', minutes_late = NULL, employee_name = 'Unknown', department = 'Unknown'
+        WHERE {where} AND status IS NOT 'INVALID'
+          AND license_plate NOT IN (SELECT license_plate FROM main.employees)
+    """), params).rowcount
+    return matched + unmatched
+
+
+def reevaluate_arrivals(engine, since=None, until=None, default_grace=DEFAULT_GRACE_MINUTES,
+                        include_archive=True, archive_path=ARCHIVE_PATH):
+    """
+    Recompute status, minutes_late and employee details of the entries in
+    [since, until) from the current schedules and grace periods, with
+    set-based UPDATEs (one transaction per table) instead of row by row.
+    Archived months overlapping the range are included.
+    Returns the number of entries changed.
+    """
+    clauses, params = ["1"], {'default_grace': default_grace}
+    if since is not None:
+        clauses.append("timestamp >= :since")
+        params['since'] = since.strftime(TIMESTAMP_FORMAT)
+    if until is not None:
+        clauses.append("timestamp < :until")
+        params['until'] = until.strftime(TIMESTAMP_FORMAT)
+    where = " AND ".join(clauses)
+
+    start = timer.perf_counter()
+    changed = 0
+    with engine.begin() as conn:
+        changed += _reevaluate_table(conn, 'main.entry_logs', where, params)
+
+    if include_archive and Path(archive_path).exists():
+        with engine.connect() as conn:
+            attach_archive(conn, archive_path)
+            months = archive_months(conn)
+            conn.rollback()
+        for month in months:
+            month_end = datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+            if (until is not None and month >= until) or (since is not None and month_end <= since):
+                continue
+            with engine.begin() as conn:
+                attach_archive(conn, archive_path)
+                changed += _reevaluate_table(conn, f"archive.{archive_table_name(month)}", where, params)
+
+    elapsed = timer.perf_counter() - start
+    print(f"Re-evaluated arrivals: {changed} entries changed in {elapsed:.2f}s")
+    return changed
@@ -0,0 +1,187 @@
+from collections import defaultdict
+
+
+def align(reference, text):
+    """
+    Levenshtein-align `text` to `reference`. Returns a list with one entry per
+    reference position: the aligned character of `text`, or None where `text`
+    has a deletion. Characters inserted by `text` are dropped.
+    """
+    n, m = len(reference), len(text)
+    dist = [[0] * (m + 1) for _ in range(n + 1)]
+    for i in range(n + 1):
+        dist[i][0] = i
+    for j in range(m + 1):
+        dist[0][j] = j
+    for i in range(1, n + 1):
+        for j in range(1, m + 1):
+            cost = 0 if reference[i-1] == text[j-1] else 1
+            dist[i][j] = min(dist[i-1][j-1] + cost, dist[i-1][j] + 1, dist[i][j-1] + 1)
+
+    # Walk back from the bottom-right corner to recover the alignment
+    aligned = [None] * n
+    i, j = n, m
+    while i > 0 and j > 0:
+        cost = 0 if reference[i-1] == text[j-1] else 1
+        if dist[i][j] == dist[i-1][j-1] + cost:
+            aligned[i-1] = text[j-1]
+            i, j = i - 1, j - 1
+        elif dist[i][j] == dist[i-1][j] + 1:
+            i -= 1
+        else:
+            j -= 1
+    return aligned
+
+
+class PlateConsensus:
+    """
+    Confidence-weighted, per-character vote over repeated OCR reads of one
+    vehicle's plate.
+
+    Reads are aligned to a reference string (the plate length with the most
+    weight behind it, best read of that length) so that a dropped or extra
+    character in one read does not shift every later position. The consensus
+    score measures agreement only: the lower of the weakest position's share
+    of the total vote and the share of weight agreeing on the length, with
+    each read's OCR confidence as its vote weight. Reads that agree but were
+    all read with low confidence are kept from deciding early by a separate
+    minimum on the mean read confidence.
+
+    Failed reads hold no vote but count towards `max_reads`, so a plate that
+    cannot be read is not OCR'd on every frame it stays in view.
+    """
+
+    def __init__(self, threshold=0.75, min_reads=2, max_reads=8, min_confidence=0.5):
+        self.threshold = threshold
+        self.min_reads = min_reads
+        self.max_reads = max_reads
+        self.min_confidence = min_confidence
+        self.reads = []
+        self.attempts = 0
+
+    def add(self, text, confidence=1.0):
+        self.attempts += 1
+        if text:
+            self.reads.append((text, max(float(confidence), 1e-3)))
+
+    def reference(self):
+        length_weight = defaultdict(float)
+        for text, confidence in self.reads:
+            length_weight[len(text)] += confidence
+        length = max(length_weight, key=length_weight.get)
+        best = max((r for r in self.reads if len(r[0]) == length), key=lambda r: r[1])
+        return best[0], length_weight[length]
+
+    def result(self):
+        """Return (plate_text, score), or (None, 0.0) if nothing has been read"""
+        if not self.reads:
+            return None, 0.0
+
+        reference, length_support = self.reference()
+        total = sum(confidence for _, confidence in self.reads)
+        votes = [defaultdict(float) for _ in reference]
+        for text, confidence in self.reads:
+            for position, char in enumerate(align(reference, text)):
+                if char is not None:
+                    votes[position][char] += confidence
+
+        chars = []
+        weakest = 1.0
+        for position_votes in votes:
+            char, weight = max(position_votes.items(), key=lambda item: item[1])
+            chars.append(char)
+            weakest = min(weakest, weight / total)
+
+        return ''.join(chars), min(weakest, length_support / total)
+
+    @property
+    def mean_confidence(self):
+        return sum(confidence for _, confidence in self.reads) / len(self.reads) if self.reads else 0.0
+
+    @property
+    def confident(self):
+        return (len(self.reads) >= self.min_reads and self.mean_confidence >= self.min_confidence
+                and self.result()[1] >= self.threshold)
+
+    @property
+    def exhausted(self):
+        return self.attempts >= self.max_reads
+
+
+class ConsensusTracker:
+    """
+    Drives OCR for a single camera's video stream, one vehicle at a time.
+
+    A vehicle is a run of frames with a detected plate; it ends after
+    `gap_frames` consecutive frames without one. OCR is requested only until
+    the vehicle's consensus is confident (or `max_reads` reads, failed ones
+    included, have been attempted), and
+    `on_decision(plate_text, score)` is called exactly once per vehicle.
+    """
+
+    def __init__(self, on_decision, threshold=0.75, min_reads=2, max_reads=8, gap_frames=15, min_confidence=0.5):
+        self.on_decision = on_decision
+        self.threshold = threshold
+        self.min_confidence = min_confidence
+        self.min_reads = min_reads
+        self.max_reads = max_reads
+        self.gap_frames = gap_frames
+
+        self.consensus = None
+        self.decided = False
+        self.missed_frames = 0
+
+        self.stats = {'frames': 0, 'ocr_calls': 0, 'vehicles': 0, 'early_exits': 0}
+
+    def wants_ocr(self):
+        """Whether the plate detected in the current frame should be read"""
+        return not self.decided
+
+    def observe(self, plate_detected, text=None, confidence=1.0):
+        """
+        Record one frame. Pass the OCR result if OCR was run on it
+        (text may be None if the read failed).
+        """
+        self.stats['frames'] += 1
+
+        if not plate_detected:
+            if self.consensus is not None:
+                self.missed_frames += 1
+                if self.missed_frames >= self.gap_frames:
+                    self.finish()
+            return
+
+        self.missed_frames = 0
+        if self.consensus is None:
+            self.consensus = PlateConsensus(self.threshold, self.min_reads, self.max_reads, self.min_confidence)
+            self.decided = False
+            self.stats['vehicles'] += 1
+
+        if self.decided:
+            return
+
+        self.stats['ocr_calls'] += 1
+        self.consensus.add(text, confidence)
+        if self.consensus.confident:
+            self.stats['early_exits'] += 1
+            self.decide()
+        elif self.consensus.exhausted:
+            self.decide()
+
+    def decide(self):
+        self.decided = True
+        plate_text, score = self.consensus.result()
+        if plate_text:
+            self.on_decision(plate_text, score)
+
+    def finish(self):
+        """End the current vehicle, deciding on whatever has been read so far"""
+        if self.consensus is not None and not self.decided:
+            self.decide()
+        self.consensus = None
+        self.decided = False
+        self.missed_frames = 0
+
+    @property
+    def ocr_per_vehicle(self):
+        return self.stats['ocr_calls'] / self.stats['vehicles'] if self.stats['vehicles'] else 0.0
@@ -0,0 +1,71 @@
+import cv2
+import numpy as np
+
+
+class ContourPlateDetector:
+    """
+    Plate candidates from edges and morphology instead of a Haar cascade.
+
+    Characters on a plate form a dense band of vertical edges. The horizontal
+    Sobel gradient is thresholded, closed with a wide kernel so the characters
+    merge into one blob, and connected components are kept if their box has a
+    plate-like aspect ratio, size and fill. Not tied to one plate format, and
+    a single pass over the image rather than one per scale.
+
+    detectMultiScale mirrors CascadeClassifier.detectMultiScale so it can be
+    used anywhere the cascade is (scaleFactor and minNeighbors are ignored).
+    """
+
+    def __init__(self, aspect_range=(2.0, 7.0), min_fill=0.45, close_kernel=(17, 5),
+                 padding=(0.05, 0.3), max_candidates=5):
+        self.aspect_range = aspect_range
+        self.min_fill = min_fill
+        self.close_kernel = close_kernel
+        # The blob covers the characters; pad it out to the plate border
+        self.padding = padding
+        self.max_candidates = max_candidates
+
+    def edge_mask(self, gray):
+        """Binary mask of vertical-edge bands, closed so characters join up"""
+        blurred = cv2.GaussianBlur(gray, (5, 5), 0)
+        grad_x = cv2.convertScaleAbs(cv2.Sobel(blurred, cv2.CV_16S, 1, 0, ksize=3))
+        _, mask = cv2.threshold(grad_x, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+
+        # Close horizontally across character gaps, then remove thin noise
+        mask = cv2.morphologyEx(mask, cv2.MORPH_CLOSE, cv2.getStructuringElement(cv2.MORPH_RECT, self.close_kernel))
+        mask = cv2.morphologyEx(mask, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (5, 3)))
+        return mask
+
+    def detectMultiScale(self, gray, scaleFactor=None, minNeighbors=None, minSize=(20, 20), maxSize=(300, 100)):
+        mask = self.edge_mask(gray)
+        count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        if count <= 1:
+            return np.empty((0, 4), dtype=np.int32)
+
+        # Vectorised filtering over all components (row 0 is the background)
+        x, y, w, h, area = (stats[1:, i].astype(np.int64) for i in range(5))
+        aspect = w / np.maximum(h, 1)
+        fill = area / np.maximum(w * h, 1)
+
+        # Pad to the plate border, clamped to the image
+        pad_x = (w * self.padding[0]).astype(np.int64)
+        pad_y = (h * self.padding[1]).astype(np.int64)
+        x1 = np.maximum(0, x - pad_x)
+        y1 = np.maximum(0, y - pad_y)
+        x2 = np.minimum(gray.shape[1], x + w + pad_x)
+        y2 = np.minimum(gray.shape[0], y + h + pad_y)
+        pw, ph = x2 - x1, y2 - y1
+
+        keep = (
+            (aspect >= self.aspect_range[0]) & (aspect <= self.aspect_range[1]) &
+            (fill >= self.min_fill) &
+            (pw >= minSize[0]) & (ph >= minSize[1]) &
+            (pw <= maxSize[0]) & (ph <= maxSize[1])
+        )
+        if not keep.any():
+            return np.empty((0, 4), dtype=np.int32)
+
+        boxes = np.stack([x1, y1, pw, ph], axis=1)[keep]
+        # Most plate-like first: dense, large components
+        order = np.argsort(-(fill[keep] * area[keep]))
+        return boxes[order][:self.max_candidates].astype(np.int32)
@@ -0,0 +1,66 @@
+from datetime import datetime, timedelta
+from sqlalchemy import func
+
+from setup_db import EntryLog
+
+
+def normalize_plate(plate_number):
+    return ''.join(c for c in plate_number if c.isalnum()).upper()
+
+
+class EntryDebouncer:
+    """
+    In-memory TTL cache of recently logged plates.
+
+    A plate seen again within `window_seconds` of its last sighting is
+    suppressed, and the sighting extends the window, so a car dwelling at the
+    gate produces a single entry however many frames it appears in.
+    """
+
+    def __init__(self, window_seconds=300, evict_every=1000):
+        self.window = timedelta(seconds=window_seconds)
+        self.evict_every = evict_every
+        self.last_seen = {}
+        self._checks = 0
+        self.stats = {'logged': 0, 'suppressed': 0, 'seeded': 0}
+
+    def seed(self, session, now=None):
+        """Load plates logged within the window so a restart does not re-log them"""
+        now = now or datetime.now()
+        rows = session.query(EntryLog.license_plate, func.max(EntryLog.timestamp))\
+            .filter(EntryLog.timestamp >= now - self.window)\
+            .group_by(EntryLog.license_plate)\
+            .all()
+        for plate_number, timestamp in rows:
+            if plate_number:
+                key = normalize_plate(plate_number)
+                self.last_seen[key] = max(timestamp, self.last_seen.get(key, timestamp))
+        self.stats['seeded'] = len(rows)
+
+    def should_log(self, plate_number, now=None):
+        """Return True if this sighting should be logged, False if it is a repeat"""
+        now = now or datetime.now()
+        key = normalize_plate(plate_number)
+
+        self._checks += 1
+        if self._checks % self.evict_every == 0:
+            self.evict(now)
+
+        last = self.last_seen.get(key)
+        self.last_seen[key] = now
+        if last is not None and now - last < self.window:
+            self.stats['suppressed'] += 1
+            return False
+
+        self.stats['logged'] += 1
+        return True
+
+    def evict(self, now=None):
+        """Drop plates whose window has expired"""
+        cutoff = (now or datetime.now()) - self.window
+        self.last_seen = {k: t for k, t in self.last_seen.items() if t >= cutoff}
+
+    def print_report(self):
+        stats = self.stats
+        print(f"\nEntries logged: {stats['logged']}, duplicates suppressed: {stats['suppressed']} "
+              f"(window {int(self.window.total_seconds())}s, {stats['seeded']} plates seeded from the log)")
@@ -1,5 +1,5 @@
 import cv2
-import easyocr
+import time
 import numpy as np
 from datetime import datetime
 from sqlalchemy import create_engine, select
@@ -10,43 +10,101 @@ from enum import Enum
 # Import our database models from setup_db.py
 import sys
 sys.path.append('..')
-from setup_db import Employee, EntryLog, Base, EntryStatus
+from setup_db import Employee, EntryLog, Base, EntryStatus, upgrade_schema
+from src import model_registry
+from src.roi import ROILearner
+from src.preprocess import PreprocessPipeline
+from src.debounce import EntryDebouncer
+from src.tiling import TiledDetector
+from src.quality import PlateQualityGate
+from src.contour_detector import ContourPlateDetector
+from src.thread_budget import ThreadBudget
+from src.arrival import DEFAULT_GRACE_MINUTES, arrival_status
+from src.profiling import StageTimer
 
 class LicensePlateDetector:
-    def __init__(self):
-        # Initialize EasyOCR
-        self.reader = easyocr.Reader(['en'])
-
-        # Load the cascade classifier
-        cascade_path = Path('models/haarcascade_russian_plate_number.xml')
-        self.plate_cascade = cv2.CascadeClassifier(str(cascade_path))
-
-        if self.plate_cascade.empty():
-            raise ValueError("Error: Cascade classifier not loaded properly")
+    def __init__(self, camera_id=None, debounce_seconds=300, tile_workers=0, quality_threshold=0.5,
+                 detector='cascade', thread_budget=None, db_url='sqlite:///database/parking.db',
+                 grace_minutes=DEFAULT_GRACE_MINUTES):
+        # Split the CPU between OpenCV, tile threads and torch before loading models
+        self.thread_budget = thread_budget or ThreadBudget(tile_workers=tile_workers)
+        self.thread_budget.apply()
+        print(f"Thread budget: {self.thread_budget.describe()}")
+
+        # Initialize EasyOCR (shared, loaded once per process)
+        self.reader = model_registry.get_reader(['en'])
+
+        # Load the plate detector: the Haar cascade, or the edge/contour
+        # detector, which has the same detectMultiScale interface
+        if detector == 'contour':
+            self.plate_cascade = ContourPlateDetector()
+        elif detector == 'cascade':
+            self.plate_cascade = model_registry.get_cascade(model_registry.PLATE_CASCADE)
+        else:
+            raise ValueError(f"Unknown plate detector: {detector}")
 
         # Initialize database connection
-        self.engine = create_engine('sqlite:///database/parking.db')
+        self.engine = create_engine(db_url)
+        upgrade_schema(self.engine)
         Session = sessionmaker(bind=self.engine)
         self.session = Session()
 
+        # Grace period for employees without their own (also used by reevaluate)
+        self.grace_minutes = grace_minutes
+
+        # Suppress repeated entries for a vehicle dwelling at the gate
+        self.debouncer = EntryDebouncer(debounce_seconds) if debounce_seconds else None
+        if self.debouncer:
+            self.debouncer.seed(self.session)
+
+        # Learn where plates appear for fixed cameras
+        self.roi_learner = ROILearner(camera_id) if camera_id else None
+
+        # Reusable buffers for the per-frame image operations
+        self.preprocess = PreprocessPipeline()
+
+        # Split very large frames into tiles detected in parallel (the contour
+        # detector is a single pass over the frame and does not need tiling)
+        self.tiled_detector = None
+        if tile_workers and detector == 'cascade':
+            self.tiled_detector = TiledDetector(model_registry.PLATE_CASCADE, workers=tile_workers)
+
+        # Skip OCR on blurred, tiny, over-exposed or non-text detections
+        self.quality_gate = PlateQualityGate(quality_threshold, char_fraction=self.preprocess.char_fraction) \
+            if quality_threshold else None
+        self.ocr_stats = {'calls': 0, 'seconds': 0.0}
+
+        # Plate box (x1, y1, x2, y2) in the last processed image, for cropping
+        # output, and the time each stage of processing it took
+        self.last_box = None
+        self.last_stages = StageTimer()
+
     def detect_plate(self, image):
         # Convert to grayscale
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = self.preprocess.gray(image)
 
         # Detect plates
-        plates = self.plate_cascade.detectMultiScale(
-            gray,
-            scaleFactor=1.1,
-            minNeighbors=5,
-            minSize=(20,20),
-            maxSize=(300,100)
-        )
+        if self.roi_learner:
+            plates = self.roi_learner.detect(self.plate_cascade, gray)
+        elif self.tiled_detector:
+            plates = self.tiled_detector.detect(gray)
+        else:
+            plates = self.plate_cascade.detectMultiScale(
+                gray,
+                scaleFactor=1.1,
+                minNeighbors=5,
+                minSize=(20,20),
+                maxSize=(300,100)
+            )
 
         if len(plates) == 0:
             return None, None
 
-        # Get the first plate detected
-        (x, y, w, h) = plates[0]
+        # Get the first plate detected that is worth reading
+        box = self.select_plate(gray, plates)
+        if box is None:
+            return None, None
+        (x, y, w, h) = box
 
         # Add padding to the detection
         padding = 5
@@ -55,30 +113,43 @@ class LicensePlateDetector:
         w = min(image.shape[1] - x, w + 2*padding)
         h = min(image.shape[0] - y, h + 2*padding)
 
-        # Extract the plate region
-        plate_region = gray[y:y+h, x:x+w]
-
-        # Apply some image processing to improve OCR
-        plate_region = cv2.equalizeHist(plate_region)
-        plate_region = cv2.GaussianBlur(plate_region, (5,5), 0)
+        # Extract the plate region and apply some image processing to improve OCR
+        plate_region = self.preprocess.plate(gray, (x, y, w, h))
 
         return plate_region, (x, y, x+w, y+h)
 
+    def select_plate(self, gray, plates):
+        """Return the first detection that passes the quality gate, or None"""
+        if not self.quality_gate:
+            return plates[0]
+        return self.quality_gate.select(gray, plates)
+
     def read_plate(self, plate_image):
+        return self.read_plate_scored(plate_image)[0]
+
+    def read_plate_scored(self, plate_image):
+        """
+        Read the plate text along with the OCR confidence
+        Returns: (plate_number, confidence), plate_number is None if unreadable
+        """
         try:
-            # Improve image quality for OCR
-            plate_image = cv2.resize(plate_image, None, fx=2, fy=2, interpolation=cv2.INTER_CUBIC)
+            # Bring the characters to the size OCR works best at
+            plate_image = self.preprocess.normalize_for_ocr(plate_image)
 
+            start = time.perf_counter()
             results = self.reader.readtext(plate_image)
+            self.ocr_stats['calls'] += 1
+            self.ocr_stats['seconds'] += time.perf_counter() - start
             if results:
                 # Get the text with highest confidence
-                text = max(results, key=lambda x: x[2])[1]
+                _, text, confidence = max(results, key=lambda x: x[2])
                 # Clean the text (keep only alphanumeric characters)
                 plate_number = ''.join(c for c in text if c.isalnum()).upper()
-                return plate_number if len(plate_number) >= 4 else None
+                if len(plate_number) >= 4:
+                    return plate_number, confidence
         except Exception as e:
             print(f"Error reading plate: {e}")
-            return None
+        return None, 0.0
 
     def find_employee(self, plate_number):
         return self.session.query(Employee).filter_by(license_plate=plate_number).first()
@@ -88,27 +159,15 @@ class LicensePlateDetector:
         Check arrival status compared to expected time
         Returns: (status, minutes_late)
         """
-        if not employee:
-            return EntryStatus.INVALID, None
-
-        entry_time = entry_time.time()
-        expected_time = employee.expected_arrival
-
-        # Convert times to minutes since midnight for comparison
-        entry_minutes = entry_time.hour * 60 + entry_time.minute
-        expected_minutes = expected_time.hour * 60 + expected_time.minute
-
-        # Calculate difference
-        minutes_late = entry_minutes - expected_minutes
-
-        # Grace period of 15 minutes
-        if minutes_late <= 15:
-            return EntryStatus.ON_TIME, 0
-        else:
-            return EntryStatus.LATE, minutes_late
+        return arrival_status(employee, entry_time, self.grace_minutes)
 
     def log_entry(self, plate_number, employee=None):
+        """Log an entry, returning None if it repeats one inside the debounce window"""
         entry_time = datetime.now()
+        if self.debouncer and not self.debouncer.should_log(plate_number, entry_time):
+            print(f"Repeated entry for {plate_number} suppressed")
+            return None
+
         status, minutes_late = self.check_arrival_status(employee, entry_time)
 
         entry = EntryLog(
@@ -124,24 +183,34 @@ class LicensePlateDetector:
         self.session.commit()
         return entry
 
-    def process_image(self, image_path):
+    def process_image(self, image_path, annotate=True, image=None):
+        """Process one image file, or an already decoded `image` (image_path is then only a label)"""
+        self.last_box = None
+        stages = self.last_stages = StageTimer()
         try:
             # Read image
-            image = cv2.imread(str(image_path))
+            supplied = image is not None
+            if not supplied:
+                image = cv2.imread(str(image_path))
             if image is None:
                 raise ValueError(f"Could not read image: {image_path}")
+            stages.mark('read')
 
-            # Make a copy for drawing
-            result_image = image.copy()
+            # Detection works on a grayscale copy, so annotations can be drawn
+            # straight onto a frame read here without copying it; a frame
+            # passed in by the caller is copied before drawing on it
+            result_image = image
 
             # Detect plate region
             plate_region, coords = self.detect_plate(image)
+            stages.mark('detect')
             if plate_region is None:
                 print(f"No plate detected in {image_path}")
                 return None
 
             # Read plate number
             plate_number = self.read_plate(plate_region)
+            stages.mark('ocr')
             if not plate_number:
                 print(f"Could not read plate number in {image_path}")
                 return None
@@ -149,30 +218,39 @@ class LicensePlateDetector:
             # Process detection results
             if coords:
                 x1, y1, x2, y2 = coords
+                self.last_box = coords
 
                 # Find employee and log entry
                 employee = self.find_employee(plate_number)
                 entry = self.log_entry(plate_number, employee)
-
-                # Set color based on status
-                color_map = {
-                    EntryStatus.ON_TIME: (0, 255, 0),    # Green
-                    EntryStatus.LATE: (0, 165, 255),     # Orange
-                    EntryStatus.INVALID: (0, 0, 255)     # Red
-                }
-                color = color_map[entry.status]
-
-                # Draw rectangle
-                cv2.rectangle(result_image, (x1, y1), (x2, y2), color, 2)
-
-                # Add text above rectangle
-                if entry.status == EntryStatus.LATE:
-                    text = f"{plate_number} - {entry.employee_name} - {entry.status.value} ({entry.minutes_late} mins)"
-                else:
-                    text = f"{plate_number} - {entry.employee_name} - {entry.status.value}"
-
-                cv2.putText(result_image, text, (x1, y1-10),
-                          cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
+                stages.mark('log')
+                if entry is None:
+                    return None
+
+                if annotate:
+                    if supplied:
+                        result_image = image.copy()
+
+                    # Set color based on status
+                    color_map = {
+                        EntryStatus.ON_TIME: (0, 255, 0),    # Green
+                        EntryStatus.LATE: (0, 165, 255),     # Orange
+                        EntryStatus.INVALID: (0, 0, 255)     # Red
+                    }
+                    color = color_map[entry.status]
+
+                    # Draw rectangle
+                    cv2.rectangle(result_image, (x1, y1), (x2, y2), color, 2)
+
+                    # Add text above rectangle
+                    if entry.status == EntryStatus.LATE:
+                        text = f"{plate_number} - {entry.employee_name} - {entry.status.value} ({entry.minutes_late} mins)"
+                    else:
+                        text = f"{plate_number} - {entry.employee_name} - {entry.status.value}"
+
+                    cv2.putText(result_image, text, (x1, y1-10),
+                              cv2.FONT_HERSHEY_SIMPLEX, 0.9, color, 2)
+                    stages.mark('annotate')
 
                 # Print results
                 print(f"\nEntry logged:")
@@ -190,6 +268,16 @@ class LicensePlateDetector:
             return None
 
     def close(self):
+        if self.quality_gate:
+            calls = self.ocr_stats['calls']
+            self.quality_gate.print_report(self.ocr_stats['seconds'] / calls if calls else None)
+        if self.tiled_detector:
+            self.tiled_detector.close()
+        if self.debouncer:
+            self.debouncer.print_report()
+        if self.roi_learner:
+            self.roi_learner.save()
+            self.roi_learner.print_report()
         self.session.close()
 
 def process_directory(input_dir):
@@ -0,0 +1,137 @@
+import itertools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+
+import cv2
+
+POLICIES = ('full', 'crop', 'thumbnail', 'none')
+FORMATS = ('jpg', 'webp')
+
+
+class ImageWriter:
+    """
+    Encodes and saves result images on a background thread pool.
+
+    `policy` selects what is saved: the full annotated frame, only the
+    plate (with its label) cropped out, a frame downscaled to
+    `thumbnail_width`, or nothing. At most `queue_size` images wait to be
+    written; beyond that submit() blocks, so a slow disk slows the pipeline
+    down rather than filling memory. Submitted images must not be modified
+    afterwards (process_image returns a fresh frame per call).
+
+    Names combine a microsecond timestamp, a sequence number and the source
+    name, and files are created exclusively, so concurrent writers never
+    overwrite each other. Encoding and file IO are timed separately.
+    """
+
+    def __init__(self, output_dir='data/detected_images', policy='full', image_format='jpg', quality=90,
+                 thumbnail_width=640, crop_margin=40, workers=2, queue_size=16):
+        if policy not in POLICIES:
+            raise ValueError(f"Unknown output policy: {policy}")
+        if image_format not in FORMATS:
+            raise ValueError(f"Unknown output format: {image_format}")
+
+        self.output_dir = Path(output_dir)
+        self.policy = policy
+        self.extension = f".{image_format}"
+        quality_flag = cv2.IMWRITE_WEBP_QUALITY if image_format == 'webp' else cv2.IMWRITE_JPEG_QUALITY
+        self.params = [quality_flag, quality]
+        self.thumbnail_width = thumbnail_width
+        self.crop_margin = crop_margin
+
+        self._sequence = itertools.count()
+        self._slots = threading.BoundedSemaphore(queue_size)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='image-writer') \
+            if policy != 'none' else None
+        self.stats = {'submitted': 0, 'written': 0, 'failed': 0, 'bytes': 0,
+                      'encode_seconds': 0.0, 'write_seconds': 0.0, 'blocked_seconds': 0.0}
+
+        if self._executor:
+            self.output_dir.mkdir(parents=True, exist_ok=True)
+
+    def output_name(self, source_name):
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        return f"detected_{stamp}_{next(self._sequence):06d}_{Path(source_name).stem}"
+
+    def prepare(self, image, box=None):
+        """The part of the image the policy keeps"""
+        if self.policy == 'crop' and box is not None:
+            x1, y1, x2, y2 = box
+            m = self.crop_margin
+            # Extra room above the box for the label drawn there
+            return image[max(0, y1 - 2 * m):y2 + m, max(0, x1 - m):x2 + m]
+        if self.policy == 'thumbnail' and image.shape[1] > self.thumbnail_width:
+            scale = self.thumbnail_width / image.shape[1]
+            return cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+        return image
+
+    def submit(self, image, source_name, box=None):
+        """Queue an image for writing. Returns the path it will be written to, or None"""
+        if self._executor is None or image is None:
+            return None
+
+        start = time.perf_counter()
+        self._slots.acquire()
+        blocked = time.perf_counter() - start
+
+        name = self.output_name(source_name)
+        with self._lock:
+            self.stats['submitted'] += 1
+            self.stats['blocked_seconds'] += blocked
+        try:
+            self._executor.submit(self._write, image, box, name)
+        except Exception:
+            self._slots.release()
+            raise
+        return self.output_dir / (name + self.extension)
+
+    def _write(self, image, box, name):
+        try:
+            start = time.perf_counter()
+            ok, encoded = cv2.imencode(self.extension, self.prepare(image, box), self.params)
+            encoded_at = time.perf_counter()
+            if not ok:
+                raise ValueError("encoding failed")
+
+            path = self.output_dir / (name + self.extension)
+            for attempt in itertools.count(1):
+                try:
+                    with open(path, 'xb') as f:
+                        f.write(encoded.tobytes())
+                    break
+                except FileExistsError:
+                    path = self.output_dir / f"{name}_{attempt}{self.extension}"
+            written_at = time.perf_counter()
+
+            with self._lock:
+                self.stats['written'] += 1
+                self.stats['bytes'] += encoded.nbytes
+                self.stats['encode_seconds'] += encoded_at - start
+                self.stats['write_seconds'] += written_at - encoded_at
+        except Exception as e:
+            with self._lock:
+                self.stats['failed'] += 1
+            print(f"Error writing {name}: {e}")
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """Wait for queued images to be written"""
+        if self._executor:
+            self._executor.shutdown(wait=True)
+
+    def print_report(self):
+        s = self.stats
+        if self.policy == 'none':
+            print("\nImage output disabled")
+            return
+        written = max(1, s['written'])
+        print(f"\nImage output ({self.policy}, {self.extension[1:]}): {s['written']} written, {s['failed']} failed, "
+              f"{s['bytes'] / written / 1024:.0f} KB/image")
+        print(f"  encode {s['encode_seconds'] / written * 1000:.1f} ms/image, "
+              f"write {s['write_seconds'] / written * 1000:.1f} ms/image, "
+              f"pipeline blocked on a full queue for {s['blocked_seconds']:.2f}s")
@@ -0,0 +1,134 @@
+import functools
+import threading
+import time
+from pathlib import Path
+
+import cv2
+
+# Models live in <repo>/models regardless of the working directory
+MODELS_DIR = Path(__file__).resolve().parent.parent / 'models'
+PLATE_CASCADE = 'haarcascade_russian_plate_number.xml'
+
+_models = {}
+_load_times = {}
+_lock = threading.Lock()
+_key_locks = {}
+_thread_local = threading.local()
+
+
+@functools.lru_cache(maxsize=None)
+def resolve_model_path(name):
+    """
+    Find a model file by name or path: as given, then in the repository's
+    models/ directory, then relative to the working directory, then among
+    OpenCV's bundled cascades. Found paths are cached, so callers on the
+    per-frame path (get_thread_cascade per tile) do not probe the filesystem.
+    """
+    path = Path(name)
+    candidates = [path, MODELS_DIR / path.name, Path.cwd() / 'models' / path.name]
+    if hasattr(cv2, 'data'):
+        candidates.append(Path(cv2.data.haarcascades) / path.name)
+
+    for candidate in candidates:
+        if candidate.is_file():
+            return candidate.resolve()
+    raise FileNotFoundError(f"Model not found: {name} (looked in {', '.join(str(c.parent) for c in candidates)})")
+
+
+def _get(key, loader):
+    """Load a model at most once per process, even with concurrent callers"""
+    model = _models.get(key)
+    if model is not None:
+        return model
+
+    with _lock:
+        key_lock = _key_locks.setdefault(key, threading.Lock())
+
+    # Only callers of the same model wait for each other
+    with key_lock:
+        model = _models.get(key)
+        if model is None:
+            start = time.perf_counter()
+            model = loader()
+            _load_times[key] = time.perf_counter() - start
+            _models[key] = model
+    return model
+
+
+def _load_cascade(path):
+    cascade = cv2.CascadeClassifier(str(path))
+    if cascade.empty():
+        raise ValueError("Error: Cascade classifier not loaded properly")
+    return cascade
+
+
+def get_cascade(name=PLATE_CASCADE):
+    """
+    CascadeClassifier shared by every caller in this process. Loading is
+    thread-safe but detection is not: use it from one thread at a time, and
+    get_thread_cascade() for concurrent detection.
+    """
+    path = resolve_model_path(name)
+    return _get(('cascade', str(path)), lambda: _load_cascade(path))
+
+
+def get_thread_cascade(name=PLATE_CASCADE):
+    """
+    CascadeClassifier private to the calling thread, for running detections
+    concurrently (a single instance is not safe to share between threads)
+    """
+    path = resolve_model_path(name)
+    cascades = getattr(_thread_local, 'cascades', None)
+    if cascades is None:
+        cascades = _thread_local.cascades = {}
+    cascade = cascades.get(path)
+    if cascade is None:
+        start = time.perf_counter()
+        cascade = cascades[path] = _load_cascade(path)
+        key = ('thread_cascade', str(path), threading.current_thread().name)
+        with _lock:
+            _load_times[key] = time.perf_counter() - start
+    return cascade
+
+
+def get_reader(languages=('en',), gpu=True):
+    """
+    EasyOCR reader shared by every caller in this process. readtext() is
+    not safe to call from several threads at once: use it from one thread at
+    a time, or load a reader per thread.
+    """
+    import easyocr
+    languages = tuple(languages)
+    return _get(('easyocr', languages, gpu), lambda: easyocr.Reader(list(languages), gpu=gpu))
+
+
+def get_tesseract(**kwargs):
+    """
+    TesseractReader shared by every caller in this process. Concurrent
+    callers are serialised by the reader's own lock around the engine, so
+    they are safe but do not run in parallel.
+    """
+    from src.tesseract_ocr import TesseractReader
+    key = ('tesseract',) + tuple(sorted(kwargs.items()))
+    return _get(key, lambda: TesseractReader(**kwargs))
+
+
+def preload(cascades=(PLATE_CASCADE,), readers=(('en',),), tesseract=False):
+    """Load models up front so the first frame does not pay for it"""
+    for name in cascades:
+        get_cascade(name)
+    for languages in readers:
+        get_reader(languages)
+    if tesseract:
+        get_tesseract()
+
+
+def load_times():
+    """Seconds spent loading each model, keyed by (kind, ...)"""
+    with _lock:
+        return dict(_load_times)
+
+
+def print_load_times():
+    for key, seconds in load_times().items():
+        print(f"Loaded {key[0]} {' '.join(str(k) for k in key[1:])} in {seconds:.2f}s")
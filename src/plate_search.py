@@ -0,0 +1,184 @@
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import text
+
+from setup_db import EntryLog
+from src.debounce import normalize_plate
+from src.retention import ARCHIVE_PATH, TIMESTAMP_FORMAT, archive_months, archive_table_name, attach_archive
+
+SEARCH_TABLE = 'entry_logs_fts'
+
+# Plates are indexed normalised (alphanumeric, upper case) so that "KA 03-MG"
+# and "KA03MG" share trigrams
+_NORMALIZED = ("upper(replace(replace(replace(coalesce({0}.license_plate, ''), ' ', ''), '-', ''), '.', ''))")
+
+_COLUMNS = ', '.join(f"e.{column.name}" for column in EntryLog.__table__.columns)
+
+
+def _entries(sql):
+    # Typed like EntryLog, so timestamps and statuses come back as objects
+    return text(sql).columns(*EntryLog.__table__.columns)
+
+
+def ensure_search_index(conn):
+    """
+    Create the trigram index over entry_logs.license_plate if it is missing,
+    fill it from the existing rows, and install triggers that keep it in step
+    with inserts, updates and deletes (including archiving). Idempotent.
+    Returns True if the index was created.
+    """
+    exists = conn.execute(text(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"
+    ), {'name': SEARCH_TABLE}).first()
+    if exists:
+        return False
+
+    # Contentless: the index only stores trigrams, rows are read from entry_logs
+    conn.execute(text(
+        f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(plate, content='', tokenize='trigram')"
+    ))
+    new, old = _NORMALIZED.format('new'), _NORMALIZED.format('old')
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS entry_logs_fts_insert AFTER INSERT ON entry_logs BEGIN
+            INSERT INTO {SEARCH_TABLE} (rowid, plate) VALUES (new.id, {new});
+        END"""))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS entry_logs_fts_delete AFTER DELETE ON entry_logs BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, plate) VALUES ('delete', old.id, {old});
+        END"""))
+    conn.execute(text(f"""
+        CREATE TRIGGER IF NOT EXISTS entry_logs_fts_update AFTER UPDATE OF license_plate ON entry_logs BEGIN
+            INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, plate) VALUES ('delete', old.id, {old});
+            INSERT INTO {SEARCH_TABLE} (rowid, plate) VALUES (new.id, {new});
+        END"""))
+    conn.execute(text(
+        f"INSERT INTO {SEARCH_TABLE} (rowid, plate) SELECT id, {_NORMALIZED.format('entry_logs')} FROM entry_logs"
+    ))
+    return True
+
+
+def trigrams(query):
+    return [query[i:i + 3] for i in range(len(query) - 2)]
+
+
+def substring_distance(query, plate):
+    """
+    Fewest edits turning `query` into some substring of `plate`, so a
+    partial plate ("8337") matches a full one ("HR26DK8337") at distance 0
+    """
+    previous = [0] * (len(plate) + 1)  # Free start anywhere in the plate
+    for i, q in enumerate(query, start=1):
+        current = [i] + [0] * len(plate)
+        for j, p in enumerate(plate, start=1):
+            current[j] = min(previous[j-1] + (q != p), previous[j] + 1, current[j-1] + 1)
+        previous = current
+    return min(previous)  # Free end anywhere in the plate
+
+
+def _time_filter(since, until):
+    clauses, params = [], {}
+    if since is not None:
+        clauses.append("e.timestamp >= :since")
+        params['since'] = since.strftime(TIMESTAMP_FORMAT)
+    if until is not None:
+        clauses.append("e.timestamp < :until")
+        params['until'] = until.strftime(TIMESTAMP_FORMAT)
+    return ''.join(f" AND {clause}" for clause in clauses), params
+
+
+def _candidates(conn, match, since, until, limit):
+    where, params = _time_filter(since, until)
+    params.update({'match': match, 'limit': limit})
+    return conn.execute(_entries(f"""
+        SELECT {_COLUMNS}
+        FROM {SEARCH_TABLE} CROSS JOIN entry_logs e ON e.id = {SEARCH_TABLE}.rowid
+        WHERE {SEARCH_TABLE} MATCH :match{where}
+        ORDER BY bm25({SEARCH_TABLE}), e.timestamp DESC
+        LIMIT :limit"""), params).all()
+
+
+def _archive_candidates(conn, query, since, until, limit, archive_path):
+    """
+    Entries of archived months overlapping [since, until) whose plate shares
+    a trigram with `query` (or contains it, if shorter than a trigram). The
+    archive has no trigram index, so each month is a LIKE scan.
+    """
+    if not Path(archive_path).exists():
+        return []
+    attach_archive(conn, archive_path)
+
+    patterns = trigrams(query) if len(query) >= 3 else [query]
+    where, params = _time_filter(since, until)
+    params['limit'] = limit
+    likes = []
+    for i, pattern in enumerate(dict.fromkeys(patterns)):
+        params[f'p{i}'] = f"%{pattern}%"
+        likes.append(f"{_NORMALIZED.format('e')} LIKE :p{i}")
+
+    rows = []
+    for month in archive_months(conn):
+        month_end = datetime(month.year + month.month // 12, month.month % 12 + 1, 1)
+        if (until is not None and month >= until) or (since is not None and month_end <= since):
+            continue
+        rows += [(f"archive.{archive_table_name(month)}", row) for row in conn.execute(_entries(f"""
+            SELECT {_COLUMNS} FROM archive.{archive_table_name(month)} e
+            WHERE ({' OR '.join(likes)}){where}
+            ORDER BY e.timestamp DESC LIMIT :limit"""), params).all()]
+    return rows
+
+
+def search_entry_logs(conn, query, since=None, until=None, limit=20, min_score=0.5, candidates=500,
+                      include_archive=True, archive_path=ARCHIVE_PATH):
+    """
+    Entries whose plate contains `query` or is close to it, best first.
+
+    Exact substrings are found with a trigram phrase query. If that gives
+    fewer than `limit` entries, entries sharing any trigram with the query
+    are fetched (best BM25 rank first, at most `candidates`) and scored by
+    edit distance to their closest substring, so OCR-garbled or partial
+    plates still match. Queries shorter than a trigram use a LIKE scan over
+    the time range instead.
+
+    Archived months overlapping the range are searched too (unless
+    `include_archive` is False), with a LIKE scan per month as they have no
+    trigram index, and ranked together with the hot entries.
+
+    Returns a list of (score, row) with score in [0, 1], 1 being an exact
+    substring match.
+    """
+    query = normalize_plate(query)
+    if not query:
+        return []
+    ensure_search_index(conn)
+
+    # Keyed by (table, id): archived and hot rows are ranked together
+    rows = {}
+    if len(query) < 3:
+        where, params = _time_filter(since, until)
+        params.update({'pattern': f"%{query}%", 'limit': limit})
+        for row in conn.execute(_entries(f"""
+                SELECT {_COLUMNS} FROM entry_logs e
+                WHERE {_NORMALIZED.format('e')} LIKE :pattern{where}
+                ORDER BY e.timestamp DESC LIMIT :limit"""), params).all():
+            rows[('main', row.id)] = row
+    else:
+        for row in _candidates(conn, f'"{query}"', since, until, limit):
+            rows[('main', row.id)] = row
+        if len(rows) < limit:
+            grams = ' OR '.join(f'"{gram}"' for gram in dict.fromkeys(trigrams(query)))
+            for row in _candidates(conn, grams, since, until, candidates):
+                rows.setdefault(('main', row.id), row)
+
+    if include_archive:
+        for table, row in _archive_candidates(conn, query, since, until, candidates, archive_path):
+            rows.setdefault((table, row.id), row)
+
+    results = []
+    for row in rows.values():
+        score = 1.0 - substring_distance(query, normalize_plate(row.license_plate or '')) / len(query)
+        if score >= min_score:
+            results.append((score, row))
+    # Best score first, newest first among equal scores
+    results.sort(key=lambda item: str(item[1].timestamp), reverse=True)
+    results.sort(key=lambda item: item[0], reverse=True)
+    return results[:limit]
@@ -0,0 +1,106 @@
+import cv2
+import numpy as np
+from collections import OrderedDict
+
+
+class PreprocessPipeline:
+    """
+    Per-frame image operations that write into preallocated buffers.
+
+    Buffers are keyed by (name, shape) so a camera running at a fixed
+    resolution reuses the same memory every frame. Plate crops vary in size,
+    so the number of cached buffers is bounded (least recently used first out).
+
+    Arrays returned by this class are reused on the next call with the same
+    shape: consume (or copy) them before processing the next frame.
+    """
+
+    def __init__(self, clahe_clip=3.0, clahe_grid=(8, 8), contrast_threshold=40.0,
+                 target_char_height=40, char_fraction=0.6, max_buffers=64):
+        self.clahe = cv2.createCLAHE(clipLimit=clahe_clip, tileGridSize=clahe_grid)
+        self.contrast_threshold = contrast_threshold
+        self.target_char_height = target_char_height
+        self.char_fraction = char_fraction
+        self.max_buffers = max_buffers
+        self._buffers = OrderedDict()
+        self.allocations = 0
+
+    def buffer(self, name, shape, dtype=np.uint8):
+        key = (name, tuple(shape), np.dtype(dtype).str)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = np.empty(shape, dtype=dtype)
+            self._buffers[key] = buf
+            self.allocations += 1
+            if len(self._buffers) > self.max_buffers:
+                self._buffers.popitem(last=False)
+        else:
+            self._buffers.move_to_end(key)
+        return buf
+
+    def gray(self, image):
+        """BGR frame to grayscale; grayscale input is returned as-is"""
+        if image.ndim == 2:
+            return image
+        dst = self.buffer('gray', image.shape[:2])
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY, dst=dst)
+
+    def plate(self, gray, box):
+        """Equalise and denoise the (x, y, w, h) crop of a grayscale frame for OCR"""
+        x, y, w, h = box
+        crop = gray[y:y+h, x:x+w]
+        equalized = cv2.equalizeHist(crop, dst=self.buffer('equalized', crop.shape))
+        return cv2.GaussianBlur(equalized, (5, 5), 0, dst=self.buffer('blurred', crop.shape))
+
+    def needs_enhancement(self, gray_crop):
+        # meanStdDev avoids the float64 temporary that ndarray.std() allocates
+        _, std = cv2.meanStdDev(gray_crop)
+        return float(std[0, 0]) < self.contrast_threshold
+
+    def enhance(self, crop):
+        """
+        CLAHE on a crop, only if it is low contrast. Grayscale crops are
+        enhanced directly; colour crops go through LAB so only L is adjusted.
+        Returns the input unchanged when no enhancement is needed.
+        """
+        if crop.ndim == 2:
+            if not self.needs_enhancement(crop):
+                return crop
+            return self.clahe.apply(crop, dst=self.buffer('clahe', crop.shape))
+
+        lab = cv2.cvtColor(crop, cv2.COLOR_BGR2LAB, dst=self.buffer('lab', crop.shape))
+        lightness = lab[:, :, 0]
+        if not self.needs_enhancement(lightness):
+            return crop
+        lab[:, :, 0] = self.clahe.apply(np.ascontiguousarray(lightness))
+        return cv2.cvtColor(lab, cv2.COLOR_LAB2BGR, dst=self.buffer('enhanced', crop.shape))
+
+    def clahe_gray(self, gray):
+        """CLAHE over a whole grayscale frame"""
+        return self.clahe.apply(gray, dst=self.buffer('clahe_frame', gray.shape))
+
+    def ocr_scale(self, plate):
+        """
+        Scale factor that brings the characters of a plate crop to the target
+        height. Characters take up roughly `char_fraction` of the crop height.
+        """
+        char_height = plate.shape[0] * self.char_fraction
+        return self.target_char_height / max(char_height, 1.0)
+
+    def normalize_for_ocr(self, plate):
+        """
+        Rescale a plate crop so its characters are about `target_char_height`
+        pixels tall: small plates are upscaled (cubic), large ones downscaled
+        (area averaging). Crops already close to the target are returned as-is.
+        """
+        scale = self.ocr_scale(plate)
+        if 0.9 <= scale <= 1.1:
+            return plate
+        interpolation = cv2.INTER_CUBIC if scale > 1 else cv2.INTER_AREA
+        return self.resize(plate, fx=scale, fy=scale, interpolation=interpolation)
+
+    def resize(self, image, fx, fy, interpolation=cv2.INTER_CUBIC):
+        h, w = image.shape[:2]
+        size = (max(1, int(round(w * fx))), max(1, int(round(h * fy))))
+        dst = self.buffer('resized', (size[1], size[0]) + image.shape[2:])
+        return cv2.resize(image, size, dst=dst, interpolation=interpolation)
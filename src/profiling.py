@@ -0,0 +1,179 @@
+import cProfile
+import heapq
+import json
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+
+MODES = ('stages', 'sample', 'deterministic')
+
+
+class StageTimer:
+    """Wall time of consecutive pipeline stages, marked as each one ends"""
+
+    def __init__(self):
+        self.stages = {}
+        self._last = time.perf_counter()
+
+    def mark(self, stage):
+        now = time.perf_counter()
+        self.stages[stage] = self.stages.get(stage, 0.0) + now - self._last
+        self._last = now
+
+
+class PipelineProfiler:
+    """
+    Profiles a sampled fraction of images going through the pipeline.
+
+    Every image gets a cheap wall-clock measurement, and the `slow_log`
+    slowest are kept with their stage breakdown (from the detector's
+    StageTimer) and the `camera_id` they came from. On top of that, images picked with probability `fraction`
+    are profiled by `mode`:
+
+    - 'sample': a background thread records the processing thread's stack
+      every `interval` seconds, written as collapsed stacks (one
+      "frame;frame;frame count" line per stack, the input flamegraph.pl and
+      speedscope take)
+    - 'deterministic': cProfile, aggregated over the profiled images and
+      written as a .prof file for pstats/snakeviz
+    - 'stages': no profiler, slow-log only
+
+    Outside profiled images nothing runs (the sampler thread is parked), so
+    overhead scales with `fraction`.
+    """
+
+    def __init__(self, mode='sample', fraction=0.05, slow_log=10, interval=0.005,
+                 output_dir='data/profiles', camera_id=None, seed=None):
+        if mode not in MODES:
+            raise ValueError(f"Unknown profiling mode: {mode}")
+        self.mode = mode
+        self.fraction = fraction
+        self.slow_log_size = slow_log
+        self.interval = interval
+        self.output_dir = Path(output_dir)
+        self.camera_id = camera_id
+        self.rng = random.Random(seed)
+
+        self.stacks = Counter()
+        self.slow = []  # Min-heap of (seconds, sequence, record)
+        self.stats = {'images': 0, 'profiled': 0, 'seconds': 0.0, 'profiled_seconds': 0.0}
+        self._sequence = 0
+
+        self._cprofile = cProfile.Profile() if mode == 'deterministic' else None
+        self._target = None  # Thread id being sampled, None when idle
+        self._active = threading.Event()  # Set while a sampled image is processed
+        self._stop = threading.Event()
+        self._sampler = None
+        if mode == 'sample':
+            self._sampler = threading.Thread(target=self._sample_loop, name='profiler-sampler', daemon=True)
+            self._sampler.start()
+
+    def _sample_loop(self):
+        while not self._stop.is_set():
+            # Parked between sampled images instead of polling
+            self._active.wait()
+            if self._stop.wait(self.interval):
+                break
+            target = self._target
+            if target is None:
+                continue
+            frame = sys._current_frames().get(target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{Path(code.co_filename).name}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    @contextmanager
+    def image(self, name, stage_timer=None):
+        """
+        Measure (and, if sampled, profile) the enclosed processing of one
+        image. `stage_timer` may be a callable returning the StageTimer of
+        the image, read once processing has finished.
+        """
+        profiled = self.mode != 'stages' and self.rng.random() < self.fraction
+        if profiled:
+            if self._cprofile:
+                self._cprofile.enable()
+            else:
+                self._target = threading.get_ident()
+                self._active.set()
+
+        start = time.perf_counter()
+        try:
+            yield profiled
+        finally:
+            elapsed = time.perf_counter() - start
+            if profiled:
+                if self._cprofile:
+                    self._cprofile.disable()
+                else:
+                    self._active.clear()
+                    self._target = None
+                self.stats['profiled'] += 1
+                self.stats['profiled_seconds'] += elapsed
+            self.stats['images'] += 1
+            self.stats['seconds'] += elapsed
+            timer = stage_timer() if callable(stage_timer) else stage_timer
+            self._record(name, elapsed, timer.stages if timer else {}, profiled)
+
+    def _record(self, name, seconds, stages, profiled):
+        record = {'image': str(name), 'camera': self.camera_id, 'seconds': round(seconds, 4), 'profiled': profiled,
+                  'stages': {stage: round(t, 4) for stage, t in stages.items()}}
+        self._sequence += 1
+        item = (seconds, self._sequence, record)
+        if len(self.slow) < self.slow_log_size:
+            heapq.heappush(self.slow, item)
+        elif seconds > self.slow[0][0]:
+            heapq.heapreplace(self.slow, item)
+
+    def slowest(self):
+        return [record for _, _, record in sorted(self.slow, reverse=True)]
+
+    def close(self):
+        """Stop sampling and write the profile and slow-log. Returns the paths written"""
+        self._stop.set()
+        self._active.set()  # Wake the sampler so it sees the stop
+        if self._sampler:
+            self._sampler.join()
+
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        stem = self.output_dir / datetime.now().strftime("profile_%Y%m%d_%H%M%S")
+        paths = []
+
+        if self.stacks:
+            path = stem.with_suffix('.folded')
+            with open(path, 'w') as f:
+                for stack, count in self.stacks.most_common():
+                    f.write(f"{stack} {count}\n")
+            paths.append(path)
+        if self._cprofile and self.stats['profiled']:
+            path = stem.with_suffix('.prof')
+            self._cprofile.dump_stats(str(path))
+            paths.append(path)
+
+        path = Path(f"{stem}_slow.json")
+        with open(path, 'w') as f:
+            json.dump({'stats': self.stats, 'slowest': self.slowest()}, f, indent=2)
+        paths.append(path)
+        return paths
+
+    def print_report(self, paths=()):
+        images = max(1, self.stats['images'])
+        print(f"\nProfiled {self.stats['profiled']} of {self.stats['images']} images ({self.mode}), "
+              f"mean {self.stats['seconds'] / images * 1000:.1f} ms/image")
+        print(f"Slowest {len(self.slow)} images:")
+        for record in self.slowest():
+            stages = ', '.join(f"{stage} {t * 1000:.0f}" for stage, t in record['stages'].items())
+            camera = f"[{record['camera']}] " if record['camera'] else ""
+            print(f"  {record['seconds'] * 1000:7.1f} ms  {camera}{Path(record['image']).name}  "
+                  f"({stages or 'no stages'})")
+        for path in paths:
+            print(f"Wrote {path}")
@@ -0,0 +1,133 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+from sqlalchemy import Column, MetaData, Table, text, select, union_all
+
+from setup_db import EntryLog
+
+ARCHIVE_PATH = 'database/archive.db'
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+
+def _ts(value):
+    # Matches the format SQLAlchemy uses to store DateTime columns in SQLite
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def _next_month(value):
+    return datetime(value.year + value.month // 12, value.month % 12 + 1, 1)
+
+
+def archive_table_name(month):
+    return f"entry_logs_{month.year:04d}{month.month:02d}"
+
+
+def attach_archive(conn, archive_path=ARCHIVE_PATH):
+    """Attach the archive database to this connection as `archive` (idempotent)"""
+    attached = {row[1] for row in conn.execute(text("PRAGMA database_list"))}
+    if 'archive' not in attached:
+        Path(archive_path).parent.mkdir(parents=True, exist_ok=True)
+        conn.execute(text("ATTACH DATABASE :path AS archive"), {'path': str(archive_path)})
+
+
+def archive_months(conn):
+    """Months (as datetimes) that have an archive table, oldest first"""
+    rows = conn.execute(text(
+        "SELECT name FROM archive.sqlite_master WHERE type = 'table' AND name LIKE 'entry_logs_%'"
+    ))
+    months = []
+    for (name,) in rows:
+        suffix = name[len('entry_logs_'):]
+        if len(suffix) == 6 and suffix.isdigit():
+            months.append(datetime(int(suffix[:4]), int(suffix[4:]), 1))
+    return sorted(months)
+
+
+def enable_incremental_vacuum(engine):
+    """
+    Switch the main database to incremental auto-vacuum. Changing the mode
+    needs one full VACUUM, so this is only done if it is not already set.
+    """
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        mode = conn.execute(text("PRAGMA auto_vacuum")).scalar()
+        if mode != 2:
+            print("Enabling incremental vacuum (one-time full VACUUM)...")
+            conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            conn.execute(text("VACUUM"))
+
+
+def rotate_entry_logs(engine, hot_days=30, archive_path=ARCHIVE_PATH, vacuum_pages=2000, now=None):
+    """
+    Move entries older than `hot_days` into per-month tables in the archive
+    database, one transaction per month, then reclaim up to `vacuum_pages`
+    free pages from the main database.
+    Returns the number of rows archived.
+    """
+    cutoff = (now or datetime.now()) - timedelta(days=hot_days)
+    enable_incremental_vacuum(engine)
+
+    with engine.begin() as conn:
+        conn.execute(text("CREATE INDEX IF NOT EXISTS ix_entry_logs_timestamp ON entry_logs (timestamp)"))
+        months = [row[0] for row in conn.execute(text(
+            "SELECT DISTINCT substr(timestamp, 1, 7) FROM entry_logs WHERE timestamp < :cutoff"
+        ), {'cutoff': _ts(cutoff)})]
+
+    archived = 0
+    for month_key in sorted(m for m in months if m):
+        month = datetime.strptime(month_key, '%Y-%m')
+        table = archive_table_name(month)
+        params = {
+            'start': _ts(month),
+            'end': _ts(min(_next_month(month), cutoff)),
+        }
+        where = "timestamp >= :start AND timestamp < :end"
+
+        with engine.begin() as conn:
+            attach_archive(conn, archive_path)
+            conn.execute(text(f"CREATE TABLE IF NOT EXISTS archive.{table} AS SELECT * FROM main.entry_logs WHERE 0"))
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS archive.ix_{table}_timestamp ON {table} (timestamp)"))
+            conn.execute(text(f"INSERT INTO archive.{table} SELECT * FROM main.entry_logs WHERE {where}"), params)
+            moved = conn.execute(text(f"DELETE FROM main.entry_logs WHERE {where}"), params).rowcount
+            archived += moved
+            print(f"Archived {moved} entries to {table}")
+
+    with engine.connect().execution_options(isolation_level='AUTOCOMMIT') as conn:
+        conn.execute(text(f"PRAGMA incremental_vacuum({int(vacuum_pages)})"))
+
+    print(f"Archived {archived} entries older than {hot_days} days")
+    return archived
+
+
+def _log_table(name, metadata, schema=None):
+    columns = [Column(column.name, column.type) for column in EntryLog.__table__.columns]
+    return Table(name, metadata, *columns, schema=schema)
+
+
+def query_entry_logs(conn, since, until=None, archive_path=ARCHIVE_PATH):
+    """
+    Entries with since <= timestamp (< until), newest first, taken from the
+    hot table and any archive months that overlap the range. Returns rows with
+    the same attributes as EntryLog.
+    """
+    metadata = MetaData()
+    tables = [EntryLog.__table__]
+
+    if Path(archive_path).exists():
+        attach_archive(conn, archive_path)
+        for month in archive_months(conn):
+            overlaps = _next_month(month) > since and (until is None or month < until)
+            if overlaps:
+                tables.append(_log_table(archive_table_name(month), metadata, schema='archive'))
+
+    selects = []
+    for table in tables:
+        query = select(*table.c).where(table.c.timestamp >= since)
+        if until is not None:
+            query = query.where(table.c.timestamp < until)
+        selects.append(query)
+
+    if len(selects) == 1:
+        query = selects[0].order_by(EntryLog.__table__.c.timestamp.desc())
+    else:
+        combined = union_all(*selects).subquery()
+        query = select(*combined.c).order_by(combined.c.timestamp.desc())
+    return conn.execute(query).all()
@@ -0,0 +1,209 @@
+import json
+import time
+import numpy as np
+from pathlib import Path
+
+
+class ROILearner:
+    """
+    Learns where plates appear for a fixed camera and restricts the cascade
+    search to that region and size range.
+
+    Detection centres are accumulated into a coarse heatmap (normalised to the
+    frame size) and plate sizes are kept as a bounded history. Until enough
+    samples are collected, and every `sweep_interval` frames afterwards, the
+    full frame is scanned so that new plate positions can still be found.
+    """
+
+    def __init__(self, camera_id, state_dir='data/roi', grid=(24, 32),
+                 min_samples=20, sweep_interval=50, coverage=0.98,
+                 margin=0.1, min_size=(20, 20), max_size=(300, 100),
+                 max_history=500, save_every=25):
+        self.camera_id = camera_id
+        self.state_path = Path(state_dir) / f"{camera_id}.json"
+        self.grid = grid
+        self.min_samples = min_samples
+        self.sweep_interval = sweep_interval
+        self.coverage = coverage
+        self.margin = margin
+        self.min_size = min_size
+        self.max_size = max_size
+        self.max_history = max_history
+        self.save_every = save_every
+
+        self.heatmap = np.zeros(grid, dtype=np.float64)
+        self.sizes = []
+        self.frame_count = 0
+        self._unsaved = 0
+
+        # Timing statistics for the speedup report
+        self.stats = {
+            'sweep_frames': 0,
+            'sweep_time': 0.0,
+            'roi_frames': 0,
+            'roi_time': 0.0,
+            'roi_pixels': 0,
+            'frame_pixels': 0,
+        }
+
+        self.load()
+
+    @property
+    def samples(self):
+        return int(self.heatmap.sum())
+
+    def observe(self, box, frame_shape):
+        """Record a detection (x, y, w, h) in full-frame coordinates"""
+        x, y, w, h = (int(v) for v in box)
+        frame_h, frame_w = frame_shape[:2]
+        rows, cols = self.grid
+
+        cx = min(cols - 1, int((x + w / 2) / frame_w * cols))
+        cy = min(rows - 1, int((y + h / 2) / frame_h * rows))
+        self.heatmap[cy, cx] += 1
+
+        self.sizes.append((w, h))
+        if len(self.sizes) > self.max_history:
+            self.sizes = self.sizes[-self.max_history:]
+
+        self._unsaved += 1
+        if self._unsaved >= self.save_every:
+            self.save()
+
+    def region(self, frame_shape):
+        """
+        Return ((x1, y1, x2, y2), min_size, max_size) for the learned search
+        area, or None if there is not enough history yet
+        """
+        if self.samples < self.min_samples:
+            return None
+
+        frame_h, frame_w = frame_shape[:2]
+        rows, cols = self.grid
+
+        # Keep the hottest cells that together cover `coverage` of detections
+        flat = self.heatmap.ravel()
+        order = np.argsort(flat)[::-1]
+        cumulative = np.cumsum(flat[order])
+        keep = order[:np.searchsorted(cumulative, self.coverage * cumulative[-1]) + 1]
+        cell_rows, cell_cols = np.unravel_index(keep, self.grid)
+
+        sizes = np.array(self.sizes)
+        min_w, min_h = np.percentile(sizes, 1, axis=0) * (1 - self.margin)
+        max_w, max_h = np.percentile(sizes, 99, axis=0) * (1 + self.margin)
+        min_size = (max(self.min_size[0], int(min_w)), max(self.min_size[1], int(min_h)))
+        max_size = (min(self.max_size[0], int(np.ceil(max_w))), min(self.max_size[1], int(np.ceil(max_h))))
+
+        # Cells hold plate centres, so pad by half the largest plate plus margin
+        pad_x = max_size[0] / 2 + self.margin * frame_w
+        pad_y = max_size[1] / 2 + self.margin * frame_h
+        x1 = int(max(0, cell_cols.min() * frame_w / cols - pad_x))
+        y1 = int(max(0, cell_rows.min() * frame_h / rows - pad_y))
+        x2 = int(min(frame_w, (cell_cols.max() + 1) * frame_w / cols + pad_x))
+        y2 = int(min(frame_h, (cell_rows.max() + 1) * frame_h / rows + pad_y))
+
+        return (x1, y1, x2, y2), min_size, max_size
+
+    def detect(self, cascade, gray, scale_factor=1.1, min_neighbors=5):
+        """Run the cascade on the learned region, or on the full frame when sweeping"""
+        self.frame_count += 1
+        frame_h, frame_w = gray.shape[:2]
+        learned = self.region(gray.shape)
+        sweep = learned is None or self.frame_count % self.sweep_interval == 0
+
+        start = time.perf_counter()
+        if sweep:
+            plates = cascade.detectMultiScale(
+                gray,
+                scaleFactor=scale_factor,
+                minNeighbors=min_neighbors,
+                minSize=self.min_size,
+                maxSize=self.max_size
+            )
+        else:
+            (x1, y1, x2, y2), min_size, max_size = learned
+            plates = cascade.detectMultiScale(
+                gray[y1:y2, x1:x2],
+                scaleFactor=scale_factor,
+                minNeighbors=min_neighbors,
+                minSize=min_size,
+                maxSize=max_size
+            )
+            if len(plates):
+                plates = np.asarray(plates) + np.array([x1, y1, 0, 0])
+        elapsed = time.perf_counter() - start
+
+        if sweep:
+            self.stats['sweep_frames'] += 1
+            self.stats['sweep_time'] += elapsed
+        else:
+            self.stats['roi_frames'] += 1
+            self.stats['roi_time'] += elapsed
+            self.stats['roi_pixels'] += (x2 - x1) * (y2 - y1)
+            self.stats['frame_pixels'] += frame_w * frame_h
+
+        for box in plates:
+            self.observe(box, gray.shape)
+
+        return plates
+
+    def report(self):
+        """Summarise how much faster ROI detection is than a full-frame sweep"""
+        stats = self.stats
+        report = {
+            'camera_id': self.camera_id,
+            'samples': self.samples,
+            'sweep_frames': stats['sweep_frames'],
+            'roi_frames': stats['roi_frames'],
+            'mean_sweep_ms': None,
+            'mean_roi_ms': None,
+            'area_fraction': None,
+            'speedup': None,
+        }
+        if stats['sweep_frames']:
+            report['mean_sweep_ms'] = 1000 * stats['sweep_time'] / stats['sweep_frames']
+        if stats['roi_frames']:
+            report['mean_roi_ms'] = 1000 * stats['roi_time'] / stats['roi_frames']
+            report['area_fraction'] = stats['roi_pixels'] / stats['frame_pixels']
+        if report['mean_sweep_ms'] and report['mean_roi_ms']:
+            report['speedup'] = report['mean_sweep_ms'] / report['mean_roi_ms']
+        return report
+
+    def print_report(self):
+        report = self.report()
+        print(f"\nROI report for camera '{self.camera_id}':")
+        print(f"Learned samples: {report['samples']}")
+        print(f"Full sweeps: {report['sweep_frames']}, ROI frames: {report['roi_frames']}")
+        if report['mean_sweep_ms'] is not None:
+            print(f"Mean full-frame detection: {report['mean_sweep_ms']:.1f} ms")
+        if report['mean_roi_ms'] is not None:
+            print(f"Mean ROI detection: {report['mean_roi_ms']:.1f} ms "
+                  f"({report['area_fraction']:.0%} of frame)")
+        if report['speedup'] is not None:
+            print(f"Speedup: {report['speedup']:.1f}x")
+
+    def save(self):
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        state = {
+            'camera_id': self.camera_id,
+            'grid': list(self.grid),
+            'heatmap': self.heatmap.tolist(),
+            'sizes': [list(size) for size in self.sizes],
+        }
+        with open(self.state_path, 'w') as f:
+            json.dump(state, f)
+        self._unsaved = 0
+
+    def load(self):
+        if not self.state_path.exists():
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+            if tuple(state['grid']) != tuple(self.grid):
+                print(f"Ignoring ROI state for {self.camera_id}: grid size changed")
+                return
+            self.heatmap = np.array(state['heatmap'], dtype=np.float64)
+            self.sizes = [tuple(size) for size in state['sizes']][-self.max_history:]
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load ROI state for {self.camera_id}: {e}")
@@ -0,0 +1,256 @@
+import csv
+import random
+import string
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+from sqlalchemy import create_engine, text
+
+# Indian state/UT codes, the format of the plates in the employees table
+STATE_CODES = ['AP', 'DL', 'GJ', 'HR', 'KA', 'KL', 'MH', 'PB', 'RJ', 'TN', 'TS', 'UP', 'WB']
+
+
+def registered_plates(db_url='sqlite:///database/parking.db'):
+    """Plates of the employees in the database (empty if there is none)"""
+    engine = create_engine(db_url)
+    try:
+        with engine.connect() as conn:
+            return [row[0] for row in conn.execute(text("SELECT license_plate FROM employees"))]
+    except Exception:
+        return []
+    finally:
+        engine.dispose()
+
+
+def random_plate(rng):
+    """A plate in the common state / district / series / number format, e.g. KA03MG9267"""
+    series = ''.join(rng.choices(string.ascii_uppercase, k=rng.choice([1, 2])))
+    return f"{rng.choice(STATE_CODES)}{rng.randint(1, 99):02d}{series}{rng.randint(1, 9999):04d}"
+
+
+class SyntheticPlateGenerator:
+    """
+    Renders scene images containing one license plate, with ground truth.
+
+    A plate string (a registered plate with probability `registered_fraction`,
+    otherwise a random one) is drawn onto a plate background, warped with a
+    random perspective and composited onto a scene: a random crop of one of
+    the `backgrounds` images if given, otherwise a procedural road and car.
+    The scene is then degraded with lighting, blur and sensor noise.
+    """
+
+    def __init__(self, resolution=(1280, 720), plates=None, registered_fraction=0.5, backgrounds=None,
+                 plate_width=(0.08, 0.2), max_skew=0.08, max_blur=5, noise_sigma=(0, 12), seed=None):
+        self.width, self.height = resolution
+        self.plates = list(plates or [])
+        self.registered_fraction = registered_fraction if self.plates else 0.0
+        self.plate_width = plate_width
+        self.max_skew = max_skew
+        self.max_blur = max_blur
+        self.noise_sigma = noise_sigma
+        self.rng = random.Random(seed)
+        self.np_rng = np.random.default_rng(seed)
+        # Unit Gaussian noise drawn once, slightly larger than a frame; each
+        # frame uses a window at a random offset rather than new noise
+        if seed is not None:
+            cv2.setRNGSeed(seed)
+        self._noise = np.empty((self.height + 64, self.width + 64, 3), dtype=np.float32)
+        cv2.randn(self._noise, 0, 1)
+
+        self.backgrounds = []
+        if backgrounds:
+            for path in sorted(Path(backgrounds).glob('*.jp*g')):
+                image = cv2.imread(str(path))
+                if image is not None:
+                    self.backgrounds.append(image)
+
+    def plate_text(self):
+        if self.plates and self.rng.random() < self.registered_fraction:
+            return self.rng.choice(self.plates)
+        return random_plate(self.rng)
+
+    def render_plate(self, plate_text):
+        """Front-on plate image: dark characters on a white or yellow plate with a border"""
+        height = 110
+        width = int(height * self.rng.uniform(4.0, 4.7))
+        color = (255, 255, 255) if self.rng.random() < 0.7 else (40, 200, 245)
+        plate = np.empty((height, width, 3), dtype=np.uint8)
+        plate[:] = color
+        cv2.rectangle(plate, (4, 4), (width - 5, height - 5), (20, 20, 20), 4)
+
+        # Largest font scale at which the text fits the plate
+        font = self.rng.choice([cv2.FONT_HERSHEY_SIMPLEX, cv2.FONT_HERSHEY_DUPLEX])
+        thickness = self.rng.randint(5, 7)
+        (text_w, text_h), _ = cv2.getTextSize(plate_text, font, 1.0, thickness)
+        scale = min((width - 30) / text_w, (height - 36) / text_h)
+        (text_w, text_h), _ = cv2.getTextSize(plate_text, font, scale, thickness)
+        origin = ((width - text_w) // 2, (height + text_h) // 2)
+        cv2.putText(plate, plate_text, origin, font, scale, (15, 15, 15), thickness, cv2.LINE_AA)
+        return plate
+
+    def scene(self):
+        """Background frame at the target resolution"""
+        if self.backgrounds:
+            image = self.rng.choice(self.backgrounds)
+            return cv2.resize(image, (self.width, self.height), interpolation=cv2.INTER_LINEAR)
+
+        # Sky/building gradient above a road, with a car body in front
+        scene = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        top = np.array([self.rng.randint(120, 220) for _ in range(3)], dtype=np.float32)
+        road = np.array([self.rng.randint(50, 110)] * 3, dtype=np.float32)
+        ramp = np.linspace(0, 1, self.height, dtype=np.float32)[:, None, None]
+        scene[:] = (top * (1 - ramp) + road * ramp).astype(np.uint8)
+
+        car_color = tuple(self.rng.randint(20, 235) for _ in range(3))
+        x1 = self.rng.randint(0, self.width // 4)
+        x2 = self.rng.randint(3 * self.width // 4, self.width)
+        y1 = self.rng.randint(self.height // 5, self.height // 2)
+        cv2.rectangle(scene, (x1, y1), (x2, self.height), car_color, -1)
+        # Grille and lights, so the plate is not the only edge structure
+        cv2.rectangle(scene, (x1 + (x2 - x1) // 4, y1 + 30), (x2 - (x2 - x1) // 4, y1 + 80), (30, 30, 30), -1)
+        for cx in (x1 + 60, x2 - 60):
+            cv2.circle(scene, (cx, y1 + 55), 30, (220, 220, 200), -1)
+        return scene
+
+    def place(self, scene, plate):
+        """
+        Warp the plate into the scene with a random size, position and
+        perspective. Returns the plate's bounding box (x1, y1, x2, y2)
+        """
+        h, w = plate.shape[:2]
+        target_w = self.width * self.rng.uniform(*self.plate_width)
+        target_h = target_w * h / w
+        cx = self.rng.uniform(target_w, self.width - target_w)
+        cy = self.rng.uniform(self.height * 0.4, self.height - target_h)
+
+        # Corners of the plate in the scene, each jittered for perspective
+        jitter = self.max_skew * target_w
+        corners = np.float32([
+            [cx - target_w / 2, cy - target_h / 2], [cx + target_w / 2, cy - target_h / 2],
+            [cx + target_w / 2, cy + target_h / 2], [cx - target_w / 2, cy + target_h / 2],
+        ]) + self.np_rng.uniform(-jitter, jitter, (4, 2)).astype(np.float32)
+        source = np.float32([[0, 0], [w, 0], [w, h], [0, h]])
+        matrix = cv2.getPerspectiveTransform(source, corners)
+
+        # Warp only within the plate's bounding box, not the whole frame
+        x1, y1 = np.floor(corners.min(axis=0)).astype(int).clip(0)
+        x2, y2 = np.ceil(corners.max(axis=0)).astype(int)
+        x2, y2 = min(x2, self.width), min(y2, self.height)
+        offset = np.array([[1, 0, -x1], [0, 1, -y1], [0, 0, 1]], dtype=np.float64)
+        size = (x2 - x1, y2 - y1)
+        warped = cv2.warpPerspective(plate, offset @ matrix, size, flags=cv2.INTER_LINEAR)
+        mask = cv2.warpPerspective(np.full((h, w), 255, dtype=np.uint8), offset @ matrix, size)
+
+        region = scene[y1:y2, x1:x2]
+        np.copyto(region, warped, where=mask[..., None] > 127)
+        return int(x1), int(y1), int(x2), int(y2)
+
+    def degrade(self, image):
+        """Lighting, blur and noise, in place where possible"""
+        # Uneven lighting: gain, offset and a horizontal shading gradient
+        gain = self.rng.uniform(0.5, 1.3)
+        shade = np.linspace(self.rng.uniform(0.7, 1.0), self.rng.uniform(0.7, 1.0), self.width, dtype=np.float32)
+        lit = image.astype(np.float32)
+        lit *= (gain * shade)[None, :, None]
+        lit += self.rng.uniform(-30, 30)
+
+        sigma = self.rng.uniform(*self.noise_sigma)
+        if sigma > 0:
+            dy, dx = self.rng.randint(0, 64), self.rng.randint(0, 64)
+            noise = self._noise[dy:dy + self.height, dx:dx + self.width]
+            lit = cv2.scaleAdd(noise, sigma, lit)
+        image = cv2.convertScaleAbs(lit)
+
+        blur = self.rng.randint(0, self.max_blur)
+        if blur:
+            if self.rng.random() < 0.5:
+                image = cv2.GaussianBlur(image, (blur * 2 + 1, blur * 2 + 1), 0)
+            else:
+                # Horizontal motion blur, as from a car moving across the gate
+                kernel = np.zeros((blur * 2 + 1, blur * 2 + 1), dtype=np.float32)
+                kernel[blur, :] = 1.0 / (blur * 2 + 1)
+                image = cv2.filter2D(image, -1, kernel)
+        return image
+
+    def generate(self):
+        """Returns (image, plate_text, bbox)"""
+        plate_text = self.plate_text()
+        scene = self.scene()
+        bbox = self.place(scene, self.render_plate(plate_text))
+        return self.degrade(scene), plate_text, bbox
+
+
+class FramePool:
+    """
+    `size` frames rendered up front by `generator` and handed out in turn,
+    so that streaming them costs nothing. The frames are shared between
+    calls and must not be modified (process_image copies a frame it is
+    given before annotating it).
+    """
+
+    def __init__(self, generator, size=32):
+        self.frames = [generator.generate() for _ in range(size)]
+        self._next = 0
+
+    def generate(self):
+        image, plate_text, bbox = self.frames[self._next]
+        self._next = (self._next + 1) % len(self.frames)
+        return image, plate_text, bbox
+
+
+class DirectorySink:
+    """Writes generated images as JPEGs, with ground truth in labels.csv"""
+
+    def __init__(self, output_dir, jpeg_quality=90):
+        self.output_dir = Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.params = [cv2.IMWRITE_JPEG_QUALITY, jpeg_quality]
+        self._labels = open(self.output_dir / 'labels.csv', 'a', newline='')
+        self._writer = csv.writer(self._labels)
+
+    def __call__(self, index, image, plate_text, bbox):
+        name = f"synthetic_{index:06d}.jpg"
+        cv2.imwrite(str(self.output_dir / name), image, self.params)
+        self._writer.writerow([name, plate_text, *bbox])
+
+    def close(self):
+        self._labels.close()
+
+
+def stream(generator, sink, rate=None, count=None, duration=None):
+    """
+    Feed generated images to `sink(index, image, plate_text, bbox)` at up to
+    `rate` images/sec (as fast as possible if None) until `count` images or
+    `duration` seconds. When the sink cannot keep up, images are not
+    dropped: the stream falls behind schedule, which is reported as lag.
+    Generation happens on the same schedule, so pass a FramePool to measure
+    the sink alone. Returns stats: images, seconds, achieved rate, generation and sink time,
+    and the maximum lag behind schedule.
+    """
+    stats = {'images': 0, 'generate_seconds': 0.0, 'sink_seconds': 0.0, 'max_lag': 0.0}
+    interval = 1.0 / rate if rate else 0.0
+    start = time.perf_counter()
+
+    index = 0
+    while (count is None or index < count) and (duration is None or time.perf_counter() - start < duration):
+        scheduled = start + index * interval
+        now = time.perf_counter()
+        if now < scheduled:
+            time.sleep(scheduled - now)
+        else:
+            stats['max_lag'] = max(stats['max_lag'], now - scheduled)
+
+        t0 = time.perf_counter()
+        image, plate_text, bbox = generator.generate()
+        t1 = time.perf_counter()
+        sink(index, image, plate_text, bbox)
+        stats['generate_seconds'] += t1 - t0
+        stats['sink_seconds'] += time.perf_counter() - t1
+        index += 1
+
+    stats['images'] = index
+    stats['seconds'] = time.perf_counter() - start
+    stats['rate'] = index / stats['seconds'] if stats['seconds'] else 0.0
+    return stats
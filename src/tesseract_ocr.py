@@ -0,0 +1,147 @@
+import bisect
+import threading
+import numpy as np
+
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+PLATE_WHITELIST = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
+
+
+class TesseractReader:
+    """
+    Tesseract OCR for plate crops.
+
+    With tesserocr installed, one engine is initialised with the plate
+    whitelist and single-line page segmentation and reused for every call, so
+    no process is spawned and no temp files are written per plate. Without it,
+    pytesseract (a tesseract subprocess per call) is used as a fallback, and
+    batches are stacked into a single image to share one subprocess.
+    """
+
+    def __init__(self, whitelist=PLATE_WHITELIST, psm=7, oem=3, lang='eng', tessdata_path=None):
+        self.whitelist = whitelist
+        self.psm = psm
+        self.oem = oem
+        self.config = f'--oem {oem} --psm {psm} -c tessedit_char_whitelist={whitelist}'
+        self._lock = threading.Lock()
+        self.api = None
+
+        if tesserocr is not None:
+            kwargs = {'lang': lang, 'psm': psm, 'oem': oem}
+            if tessdata_path:
+                kwargs['path'] = tessdata_path
+            try:
+                self.api = tesserocr.PyTessBaseAPI(**kwargs)
+                self.api.SetVariable('tessedit_char_whitelist', whitelist)
+            except RuntimeError as e:
+                print(f"Could not initialise in-process Tesseract, using pytesseract: {e}")
+                self.api = None
+
+        if self.api is None and pytesseract is None:
+            raise ImportError("Either tesserocr or pytesseract is required for Tesseract OCR")
+
+    @property
+    def backend(self):
+        return 'tesserocr' if self.api is not None else 'pytesseract'
+
+    @staticmethod
+    def _clean(text):
+        return ''.join(c for c in text if c.isalnum())
+
+    def _recognize_in_process(self, plate):
+        plate = np.ascontiguousarray(plate)
+        height, width = plate.shape[:2]
+        channels = 1 if plate.ndim == 2 else plate.shape[2]
+        with self._lock:
+            self.api.SetImageBytes(plate.tobytes(), width, height, channels, width * channels)
+            text = self.api.GetUTF8Text()
+            confidence = self.api.MeanTextConf()
+        return self._clean(text), max(confidence, 0) / 100
+
+    def _recognize_subprocess(self, plate):
+        data = pytesseract.image_to_data(plate, config=self.config, output_type=pytesseract.Output.DICT)
+        words = [(w, float(c)) for w, c in zip(data['text'], data['conf']) if w.strip() and float(c) >= 0]
+        if not words:
+            return "", 0.0
+        text = self._clean(''.join(w for w, _ in words))
+        return text, sum(c for _, c in words) / len(words) / 100
+
+    def recognize(self, plate):
+        """Recognise one plate crop. Returns (text, confidence 0-1)"""
+        try:
+            if self.api is not None:
+                return self._recognize_in_process(plate)
+            return self._recognize_subprocess(plate)
+        except Exception as e:
+            print(f"Error in plate recognition: {str(e)}")
+            return "", 0.0
+
+    def recognize_batch(self, plates):
+        """Recognise several plate crops in one call. Returns a list of (text, confidence)"""
+        if not plates:
+            return []
+        if self.api is not None:
+            return [self.recognize(plate) for plate in plates]
+
+        try:
+            return self._recognize_stacked(plates)
+        except Exception as e:
+            print(f"Batch recognition failed, reading plates one by one: {str(e)}")
+            return [self.recognize(plate) for plate in plates]
+
+    def _recognize_stacked(self, plates):
+        """
+        Stack grayscale crops vertically with blank gaps and read them as a
+        block of lines in a single tesseract subprocess. Each word is assigned
+        to the crop whose row contains its vertical centre; a crop whose row
+        holds no line or more than one is read again on its own.
+        """
+        if any(plate.ndim != 2 for plate in plates):
+            return [self.recognize(plate) for plate in plates]
+
+        width = max(plate.shape[1] for plate in plates)
+        gap = max(plate.shape[0] for plate in plates) // 2
+        rows = []
+        row_ends = []
+        for plate in plates:
+            row = np.full((plate.shape[0] + gap, width), 255, dtype=np.uint8)
+            row[:plate.shape[0], :plate.shape[1]] = plate
+            rows.append(row)
+            row_ends.append((row_ends[-1] if row_ends else 0) + row.shape[0])
+        stacked = np.vstack(rows)
+
+        config = self.config.replace(f'--psm {self.psm}', '--psm 6')
+        data = pytesseract.image_to_data(stacked, config=config, output_type=pytesseract.Output.DICT)
+
+        # Per crop: {line key: [(left, word, confidence)]}
+        lines = [{} for _ in plates]
+        for i, word in enumerate(data['text']):
+            if not word.strip() or float(data['conf'][i]) < 0:
+                continue
+            index = bisect.bisect_right(row_ends, data['top'][i] + data['height'][i] / 2)
+            if index < len(plates):
+                key = (data['block_num'][i], data['par_num'][i], data['line_num'][i])
+                lines[index].setdefault(key, []).append((data['left'][i], word, float(data['conf'][i])))
+
+        results = []
+        for plate, plate_lines in zip(plates, lines):
+            if len(plate_lines) != 1:
+                results.append(self.recognize(plate))
+                continue
+            words = sorted(next(iter(plate_lines.values())))
+            results.append((self._clean(''.join(w for _, w, _ in words)),
+                            sum(c for _, _, c in words) / len(words) / 100))
+        return results
+
+    def close(self):
+        if self.api is not None:
+            self.api.End()
+            self.api = None
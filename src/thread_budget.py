@@ -0,0 +1,87 @@
+import os
+
+import cv2
+
+
+def available_cores():
+    """Cores this process may run on (respects affinity masks and containers)"""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+class ThreadBudget:
+    """
+    Splits the machine's cores between worker processes, OpenCV's internal
+    thread pool, tile threads and torch (used by EasyOCR), so that running
+    several detectors at once does not oversubscribe the CPU.
+
+    Each of `processes` workers gets cores // processes cores. Within a
+    worker, OpenCV gets all of them, or an equal share per tile thread when
+    tiled detection runs several detectMultiScale calls at once. Torch gets
+    the worker's cores for intra-op work and a single inter-op thread, as
+    OCR runs one image at a time.
+    """
+
+    def __init__(self, cores=None, processes=1, tile_workers=0, opencv_threads=None,
+                 torch_threads=None, torch_interop_threads=None, pin=False):
+        self.cores = cores or available_cores()
+        self.processes = max(1, processes)
+        self.tile_workers = tile_workers
+        self.pin = pin
+
+        self.cores_per_process = max(1, self.cores // self.processes)
+        if opencv_threads is None:
+            opencv_threads = max(1, self.cores_per_process // max(1, tile_workers))
+        self.opencv_threads = opencv_threads
+        self.torch_threads = torch_threads or self.cores_per_process
+        self.torch_interop_threads = torch_interop_threads or 1
+
+    def affinity(self, process_index):
+        """Cores the given worker is pinned to"""
+        if not hasattr(os, 'sched_getaffinity'):
+            return None
+        cores = sorted(os.sched_getaffinity(0))
+        start = (process_index % self.processes) * self.cores_per_process
+        return set(cores[start:start + self.cores_per_process]) or set(cores)
+
+    def apply(self, process_index=0):
+        """
+        Apply the budget to the calling process. Call at startup, before
+        models are loaded and before any parallel work starts.
+        Returns the settings that were applied.
+        """
+        applied = {'opencv_threads': self.opencv_threads}
+
+        # Libraries that size their pools from the environment when first used
+        for var in ('OMP_NUM_THREADS', 'MKL_NUM_THREADS', 'OPENBLAS_NUM_THREADS'):
+            os.environ[var] = str(self.torch_threads)
+
+        cv2.setNumThreads(self.opencv_threads)
+
+        try:
+            import torch
+        except ImportError:
+            torch = None
+        if torch is not None:
+            torch.set_num_threads(self.torch_threads)
+            applied['torch_threads'] = self.torch_threads
+            try:
+                torch.set_num_interop_threads(self.torch_interop_threads)
+                applied['torch_interop_threads'] = self.torch_interop_threads
+            except RuntimeError:
+                # Only allowed once, before any inter-op work has started
+                pass
+
+        if self.pin and hasattr(os, 'sched_setaffinity'):
+            cores = self.affinity(process_index)
+            os.sched_setaffinity(0, cores)
+            applied['affinity'] = sorted(cores)
+
+        return applied
+
+    def describe(self):
+        return (f"{self.cores} cores: {self.processes} process(es) x {self.cores_per_process} cores, "
+                f"OpenCV {self.opencv_threads} threads, {self.tile_workers or 'no'} tile threads, "
+                f"torch {self.torch_threads}/{self.torch_interop_threads} intra/inter-op threads"
+                f"{', pinned' if self.pin else ''}")
@@ -0,0 +1,103 @@
+import os
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+
+from src.model_registry import PLATE_CASCADE, get_thread_cascade
+
+
+def tile_grid(shape, tile_size, overlap):
+    """
+    Split a frame of `shape` into (x, y, w, h) tiles of at most `tile_size`
+    that overlap by `overlap`. With an overlap at least as large as the
+    biggest plate, every plate lies wholly inside at least one tile.
+    """
+    frame_h, frame_w = shape[:2]
+    tiles = []
+    for start_y, size_y in _spans(frame_h, tile_size[1], overlap[1]):
+        for start_x, size_x in _spans(frame_w, tile_size[0], overlap[0]):
+            tiles.append((start_x, start_y, size_x, size_y))
+    return tiles
+
+
+def _spans(length, size, overlap):
+    if length <= size:
+        return [(0, length)]
+    step = max(1, size - overlap)
+    starts = list(range(0, length - size, step)) + [length - size]
+    return [(start, size) for start in starts]
+
+
+def non_max_suppression(boxes, threshold=0.5):
+    """
+    Merge duplicate (x, y, w, h) boxes from overlapping tiles. Larger boxes
+    win, and a box is dropped when its overlap with a kept box covers more
+    than `threshold` of the smaller of the two, so partial detections cut by
+    a tile seam are absorbed by the full detection from the neighbouring tile.
+    """
+    if len(boxes) == 0:
+        return np.empty((0, 4), dtype=np.int32)
+
+    boxes = np.asarray(boxes, dtype=np.int32)
+    x1, y1 = boxes[:, 0], boxes[:, 1]
+    x2, y2 = x1 + boxes[:, 2], y1 + boxes[:, 3]
+    areas = boxes[:, 2] * boxes[:, 3]
+    order = np.argsort(areas)[::-1]
+
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        inter_w = np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None)
+        inter_h = np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        overlap = inter_w * inter_h / np.minimum(areas[i], areas[rest])
+        order = rest[overlap <= threshold]
+
+    return boxes[keep]
+
+
+class TiledDetector:
+    """
+    Runs the plate cascade on overlapping tiles of a large frame in a thread
+    pool. detectMultiScale releases the GIL, so tiles are processed in
+    parallel. Each worker thread gets its own CascadeClassifier from the model
+    registry, as a single instance is not safe to share between concurrent calls.
+    """
+
+    def __init__(self, cascade_name=PLATE_CASCADE, workers=None, tile_size=(1280, 720), overlap=None,
+                 scale_factor=1.1, min_neighbors=5, min_size=(20, 20), max_size=(300, 100),
+                 nms_threshold=0.5):
+        self.cascade_name = cascade_name
+        self.workers = workers or os.cpu_count() or 1
+        self.tile_size = tile_size
+        # Overlap by the largest plate plus a margin, so the cascade sees
+        # enough context around a plate near a seam to group its detections
+        self.overlap = overlap or (max_size[0] + 60, max_size[1] + 60)
+        self.params = {
+            'scaleFactor': scale_factor,
+            'minNeighbors': min_neighbors,
+            'minSize': min_size,
+            'maxSize': max_size,
+        }
+        self.nms_threshold = nms_threshold
+        self.pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='tile')
+
+    def _detect_tile(self, gray, tile):
+        x, y, w, h = tile
+        plates = get_thread_cascade(self.cascade_name).detectMultiScale(gray[y:y+h, x:x+w], **self.params)
+        if len(plates) == 0:
+            return []
+        return np.asarray(plates) + np.array([x, y, 0, 0])
+
+    def detect(self, gray):
+        """Detect plates in a grayscale frame, returning merged (x, y, w, h) boxes"""
+        tiles = tile_grid(gray.shape, self.tile_size, self.overlap)
+        if len(tiles) == 1:
+            return self._detect_tile(gray, tiles[0])
+
+        results = self.pool.map(lambda tile: self._detect_tile(gray, tile), tiles)
+        boxes = [box for plates in results for box in plates]
+        return non_max_suppression(boxes, self.nms_threshold)
+
+    def close(self):
+        self.pool.shutdown(wait=True)
@@ -1,38 +1,28 @@
 import cv2
 import numpy as np
 import argparse
+import sys
+from pathlib import Path
 
-def enhance_image(image):
-    # Apply some preprocessing to improve detection
-    # Adjust brightness and contrast
-    lab = cv2.cvtColor(image, cv2.COLOR_BGR2LAB)
-    l, a, b = cv2.split(lab)
-    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-    cl = clahe.apply(l)
-    enhanced = cv2.merge((cl,a,b))
-    enhanced = cv2.cvtColor(enhanced, cv2.COLOR_LAB2BGR)
-    return enhanced
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.preprocess import PreprocessPipeline
+from src import model_registry
 
-def detect_license_plates(image_path, save_plates=False, show_result=True):
-    # Load the cascade classifier
-    plate_cascade = cv2.CascadeClassifier('haarcascade_russian_plate_number.xml')
+# Shared across calls so buffers are reused between frames
+pipeline = PreprocessPipeline()
 
-    if plate_cascade.empty():
-        raise Exception("Error: Cascade classifier not loaded properly")
+def detect_license_plates(image_path, save_plates=False, show_result=True):
+    # Load the cascade classifier (once per process)
+    plate_cascade = model_registry.get_cascade(model_registry.PLATE_CASCADE)
 
     # Read the image
     img = cv2.imread(image_path)
     if img is None:
         raise Exception("Error: Image not loaded properly")
 
-    # Keep original for display
-    original = img.copy()
-
-    # Enhance image
-    img = enhance_image(img)
-
-    # Convert to grayscale
-    gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+    # Enhance contrast in grayscale: CLAHE on the gray frame stands in for
+    # CLAHE on the L channel without the LAB round trip on the full frame
+    gray = pipeline.clahe_gray(pipeline.gray(img))
 
     # Detect plates
     plates = plate_cascade.detectMultiScale(gray,
@@ -41,24 +31,22 @@ def detect_license_plates(image_path, save_plates=False, show_result=True):
                                           minSize=(20,20),
                                           maxSize=(300,100))
 
-    detected_plates = []
+    # Extract the plate regions before drawing on the image,
+    # enhancing only the crops that are low contrast
+    detected_plates = [pipeline.enhance(img[y:y+h, x:x+w]).copy() for (x,y,w,h) in plates]
 
     # Process each detected plate
     for i, (x,y,w,h) in enumerate(plates):
-        # Draw rectangle on original image
-        cv2.rectangle(original, (x,y), (x+w,y+h), (0,255,0), 2)
-
-        # Extract the plate region
-        plate = img[y:y+h, x:x+w]
-        detected_plates.append(plate)
+        # Draw rectangle on the image (it is only used for display from here on)
+        cv2.rectangle(img, (x,y), (x+w,y+h), (0,255,0), 2)
 
         # Add text label
-        cv2.putText(original, f'Plate {i+1}', (x, y-10),
+        cv2.putText(img, f'Plate {i+1}', (x, y-10),
                     cv2.FONT_HERSHEY_SIMPLEX, 0.9, (0,255,0), 2)
 
         # Save individual plates if requested
         if save_plates:
-            cv2.imwrite(f'plate_{i+1}.jpg', plate)
+            cv2.imwrite(f'plate_{i+1}.jpg', detected_plates[i])
 
     # Print results
     print(f"Found {len(plates)} license plates")
@@ -66,13 +54,13 @@ def detect_license_plates(image_path, save_plates=False, show_result=True):
     # Show the image if requested
     if show_result:
         # Resize if image is too large
-        height, width = original.shape[:2]
+        height, width = img.shape[:2]
         max_height = 800
         if height > max_height:
             ratio = max_height / height
-            original = cv2.resize(original, (int(width * ratio), max_height))
+            img = cv2.resize(img, (int(width * ratio), max_height))
 
-        cv2.imshow('Detected License Plates', original)
+        cv2.imshow('Detected License Plates', img)
         cv2.waitKey(0)
         cv2.destroyAllWindows()
 
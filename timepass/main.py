@@ -1,17 +1,26 @@
 import cv2
 import numpy as np
 import pytesseract
-from typing import Tuple, Optional, Union
+from typing import List, Tuple, Optional, Union
 import os
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))
+from src.consensus import ConsensusTracker
+from src import model_registry
 
 # Path to tesseract executable (modify as needed for your system)
 pytesseract.pytesseract.tesseract_cmd = r'C:Users/Priya/Downloads/tesseract-ocr-w64-setup-5.5.0.20241111.exe'
 
+# One Tesseract engine reused for every frame (falls back to pytesseract if tesserocr is missing)
+ocr = model_registry.get_tesseract()
+
 def detect_plate(image: np.ndarray) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
     """Detect license plate in the image using Haar Cascade."""
     try:
-        # Load the cascade
-        plate_cascade = cv2.CascadeClassifier('haarcascade_russian_plate_number.xml')
+        # Get the cascade, loaded once rather than on every frame
+        plate_cascade = model_registry.get_cascade(model_registry.PLATE_CASCADE)
         
         # Convert to grayscale
         gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
@@ -64,20 +73,15 @@ def process_plate(plate: np.ndarray) -> np.ndarray:
 
 def recognize_plate(plate: np.ndarray) -> str:
     """Perform OCR on the processed license plate."""
-    try:
-        # Configure tesseract for license plate recognition
-        custom_config = r'--oem 3 --psm 7 -c tessedit_char_whitelist=ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789'
-        
-        # Perform OCR
-        text = pytesseract.image_to_string(plate, config=custom_config)
-        
-        # Clean the text
-        text = ''.join(c for c in text if c.isalnum())
-        
-        return text
-    except Exception as e:
-        print(f"Error in plate recognition: {str(e)}")
-        return ""
+    return ocr.recognize(plate)[0]
+
+def recognize_plate_scored(plate: np.ndarray) -> Tuple[str, float]:
+    """Perform OCR on the processed license plate, returning (text, confidence 0-1)."""
+    return ocr.recognize(plate)
+
+def recognize_plates(plates: List[np.ndarray]) -> List[Tuple[str, float]]:
+    """Perform OCR on several processed license plates in one call."""
+    return ocr.recognize_batch(plates)
 
 def main():
     try:
@@ -91,7 +95,14 @@ def main():
         print("Press 'q' to quit")
         print("Press 's' to save the current frame")
         
-        last_text = ""  # Store last detected text to avoid duplicates
+        def on_decision(plate_text, score):
+            nonlocal display_text
+            display_text = plate_text
+            print(f"Detected License Plate: {plate_text} (consensus {score:.2f})")
+
+        # One decision per vehicle; OCR stops once the reads agree
+        tracker = ConsensusTracker(on_decision)
+        display_text = ""
         
         while True:
             # Read a frame from the camera
@@ -106,19 +117,24 @@ def main():
             # Detect plate
             plate, plate_contour = detect_plate(frame)
             
-            if plate is not None:
+            if plate is None:
+                tracker.observe(False)
+                if tracker.consensus is None:
+                    display_text = ""
+            else:
                 # Draw contour of the plate on the original image
                 cv2.drawContours(result_frame, [plate_contour], -1, (0, 255, 0), 3)
                 
-                # Process the plate for OCR
-                processed_plate = process_plate(plate)
-                
-                # Recognize text on the plate
-                plate_text = recognize_plate(processed_plate)
-                
-                if plate_text and plate_text != last_text:
-                    print(f"Detected License Plate: {plate_text}")
-                    last_text = plate_text
+                plate_text = display_text
+                if tracker.wants_ocr():
+                    # Process the plate for OCR
+                    processed_plate = process_plate(plate)
+                    
+                    # Recognize text on the plate
+                    plate_text, confidence = recognize_plate_scored(processed_plate)
+                    tracker.observe(True, plate_text, confidence)
+                else:
+                    tracker.observe(True)
                 
                 # Display the text on the frame
                 if plate_text:
@@ -141,6 +157,10 @@ def main():
                 cv2.imwrite('captured_frame.jpg', frame)
                 print("Frame saved as 'captured_frame.jpg'")
         
+        # Decide on the vehicle still in view
+        tracker.finish()
+        print(f"OCR calls per vehicle: {tracker.ocr_per_vehicle:.1f}")
+        
         # Release the camera and close windows
         cap.release()
         cv2.destroyAllWindows()
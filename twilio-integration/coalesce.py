@@ -0,0 +1,126 @@
+import hashlib
+import re
+from datetime import datetime, timedelta
+from sqlalchemy import select, func
+
+from config import NOTIFICATION_CONFIG
+from notification_service import entry_message, error_message
+from outbox import OutboxMessage, OutboxStatus, enqueue
+
+
+def error_signature(error):
+    """
+    Error text with the parts that vary between occurrences (image paths,
+    numbers, hex ids) masked, so one failing camera yields one signature
+    """
+    text = re.sub(r"\S+\.(?:jpe?g|png|bmp)\b", "<image>", str(error), flags=re.IGNORECASE)
+    text = re.sub(r"0x[0-9a-fA-F]+|\d+", "#", text)
+    return " ".join(text.split())[:200]
+
+
+class AlertCoalescer:
+    """
+    Groups notifications into one digest SMS per window per recipient.
+
+    Entries whose status is urgent (LATE by default) are queued to go out
+    immediately with the full message. Other entries and errors become
+    digest rows due at the end of the current `window_seconds` window, which
+    the outbox sender combines into a single SMS per recipient. An error
+    already queued in the window only bumps its occurrence count, and a
+    signature appears in at most `error_limit` digests per
+    `error_window_seconds`; further occurrences are dropped.
+    """
+
+    def __init__(self, to_numbers, window_seconds=None, urgent_statuses=None,
+                 error_limit=None, error_window_seconds=None):
+        config = NOTIFICATION_CONFIG
+        self.to_numbers = to_numbers
+        self.window = window_seconds if window_seconds is not None else config['digest_window_seconds']
+        self.urgent_statuses = set(urgent_statuses or config['urgent_statuses'])
+        self.error_limit = error_limit if error_limit is not None else config['error_limit']
+        self.error_window = timedelta(seconds=error_window_seconds if error_window_seconds is not None
+                                      else config['error_window_seconds'])
+        self.stats = {'urgent': 0, 'digested': 0, 'errors_merged': 0, 'errors_dropped': 0}
+
+    def window_bounds(self, now):
+        """Start and end of the coalescing window containing `now`"""
+        if not self.window:
+            return now, now
+        start = datetime.fromtimestamp(now.timestamp() // self.window * self.window)
+        return start, start + timedelta(seconds=self.window)
+
+    def entry(self, session, entry):
+        """Queue the notification for a logged entry (call before committing it)"""
+        status = entry.status.value
+        message = entry_message(entry.license_plate, entry.employee_name, status,
+                                entry.minutes_late, entry.timestamp)
+        key = f"entry:{entry.id}"
+
+        if status in self.urgent_statuses or not self.window:
+            self.stats['urgent'] += 1
+            enqueue(session, key, message, self.to_numbers, now=entry.timestamp)
+            return
+
+        summary = f"{entry.timestamp.strftime('%I:%M')} {entry.license_plate} {status}"
+        if entry.employee_name and entry.employee_name != "Unknown":
+            summary += f" ({entry.employee_name})"
+        _, due = self.window_bounds(entry.timestamp)
+        self.stats['digested'] += 1
+        enqueue(session, key, message, self.to_numbers, now=entry.timestamp, due=due,
+                kind='digest', summary=summary)
+
+    def error(self, session, error, now=None):
+        """Queue an error notification, merged with identical errors in the window"""
+        now = now or datetime.now()
+        text = error_signature(error)
+        signature = hashlib.sha1(text.encode()).hexdigest()
+        start, due = self.window_bounds(now)
+
+        while True:
+            # Already queued in this window (digest rows of a window share its
+            # due time): count it instead of queuing it again
+            merged = session.execute(
+                OutboxMessage.__table__.update()
+                .where(OutboxMessage.signature == signature,
+                       OutboxMessage.status == OutboxStatus.PENDING,
+                       OutboxMessage.next_attempt_at == due,
+                       OutboxMessage.to_number.in_(self.to_numbers))
+                .values(occurrences=OutboxMessage.occurrences + 1)
+            ).rowcount
+            if merged:
+                self.stats['errors_merged'] += 1
+                return
+
+            # The window's digest was already claimed by the sender (or sent,
+            # or rescheduled for a retry): open the next window's digest
+            # rather than reuse its key and lose the occurrence
+            key = self._error_key(signature, start)
+            claimed = session.scalar(
+                select(func.count())
+                .where(OutboxMessage.idempotency_key.in_([f"{key}:{n}" for n in self.to_numbers]))
+            )
+            if not claimed:
+                break
+            start, due = due, due + timedelta(seconds=max(1, self.window))
+
+        recent = session.scalar(
+            select(func.count(func.distinct(OutboxMessage.idempotency_key)))
+            .where(OutboxMessage.signature == signature,
+                   OutboxMessage.created_at >= now - self.error_window)
+        ) or 0
+        if recent >= self.error_limit * max(1, len(self.to_numbers)):
+            self.stats['errors_dropped'] += 1
+            return
+
+        enqueue(session, self._error_key(signature, start), error_message(error, now),
+                self.to_numbers, now=now, due=due, kind='digest', summary=f"❌ {text[:120]}",
+                signature=signature)
+
+    @staticmethod
+    def _error_key(signature, window_start):
+        return f"error:{signature[:16]}:{window_start:%Y%m%d%H%M%S}"
+
+    def print_report(self):
+        print(f"\nNotifications: {self.stats['urgent']} sent immediately, {self.stats['digested']} entries "
+              f"and {self.stats['errors_merged']} repeated errors coalesced into digests, "
+              f"{self.stats['errors_dropped']} errors over the rate limit dropped")
@@ -7,3 +7,11 @@ TWILIO_CONFIG = {
         # Add more numbers if needed
     ]
 }
+
+NOTIFICATION_CONFIG = {
+    'digest_window_seconds': 300,        # Non-urgent alerts are combined into one SMS per window
+    'urgent_statuses': ['LATE'],         # Entry statuses sent immediately instead of in the digest
+    'error_limit': 3,                    # Digests an error signature may appear in per error window
+    'error_window_seconds': 3600,
+    'digest_max_lines': 10,              # Lines listed in a digest before "+N more"
+}
@@ -1,37 +1,54 @@
 import cv2
-import easyocr
 import numpy as np
 from datetime import datetime
 from sqlalchemy import create_engine, select
 from sqlalchemy.orm import sessionmaker
 from pathlib import Path
 from enum import Enum
-from notification_service import NotificationService
+from config import TWILIO_CONFIG
+from outbox import create_outbox_table
+from coalesce import AlertCoalescer
 
 # Import our database models from setup_db.py
 import sys
 sys.path.append('..')
-from setup_db import Employee, EntryLog, Base, EntryStatus
+from setup_db import Employee, EntryLog, Base, EntryStatus, upgrade_schema
+from src.debounce import EntryDebouncer
+from src import model_registry
+from src.thread_budget import ThreadBudget
+from src.arrival import DEFAULT_GRACE_MINUTES, arrival_status
 
 class LicensePlateDetector:
-    def __init__(self):
-        # Initialize EasyOCR
-        self.reader = easyocr.Reader(['en'])
+    def __init__(self, debounce_seconds=300, thread_budget=None, grace_minutes=DEFAULT_GRACE_MINUTES):
+        # Split the CPU between OpenCV and torch before loading models
+        self.thread_budget = thread_budget or ThreadBudget()
+        self.thread_budget.apply()
 
-        # Load the cascade classifier
-        cascade_path = Path('models/haarcascade_russian_plate_number.xml')
-        self.plate_cascade = cv2.CascadeClassifier(str(cascade_path))
+        # Initialize EasyOCR (shared, loaded once per process)
+        self.reader = model_registry.get_reader(['en'])
 
-        if self.plate_cascade.empty():
-            raise ValueError("Error: Cascade classifier not loaded properly")
+        # Load the cascade classifier
+        self.plate_cascade = model_registry.get_cascade(model_registry.PLATE_CASCADE)
 
         # Initialize database connection
         self.engine = create_engine('sqlite:///database/parking.db')
-        Session = sessionmaker(bind=self.engine)
-        self.session = Session()
+        upgrade_schema(self.engine)
+        self.Session = sessionmaker(bind=self.engine)
+        self.session = self.Session()
+
+        # Grace period for employees without their own
+        self.grace_minutes = grace_minutes
 
-        # Initialize notification service
-        self.notification_service = NotificationService()
+        # Suppress repeated entries for a vehicle dwelling at the gate
+        self.debouncer = EntryDebouncer(debounce_seconds) if debounce_seconds else None
+        if self.debouncer:
+            self.debouncer.seed(self.session)
+
+        # Notifications are queued in the outbox and sent by a separate sender
+        # process (main.py -m send), so a slow SMS provider never stalls detection
+        create_outbox_table(self.engine)
+        # Non-urgent alerts and repeated errors are combined into digests
+        self.alerts = AlertCoalescer(TWILIO_CONFIG['to_numbers'])
 
     def detect_plate(self, image):
         # Convert to grayscale
@@ -82,9 +99,17 @@ class LicensePlateDetector:
                 return plate_number if len(plate_number) >= 4 else None
         except Exception as e:
             print(f"Error reading plate: {e}")
-            self.notification_service.send_error_notification(f"Error reading plate: {e}")
+            self.notify_error(f"Error reading plate: {e}")
             return None
 
+    def notify_error(self, error):
+        """Queue an error notification in its own transaction"""
+        try:
+            with self.Session.begin() as session:
+                self.alerts.error(session, error)
+        except Exception as e:
+            print(f"Failed to queue error notification: {e}")
+
     def find_employee(self, plate_number):
         return self.session.query(Employee).filter_by(license_plate=plate_number).first()
 
@@ -93,27 +118,15 @@ class LicensePlateDetector:
         Check arrival status compared to expected time
         Returns: (status, minutes_late)
         """
-        if not employee:
-            return EntryStatus.INVALID, None
-
-        entry_time = entry_time.time()
-        expected_time = employee.expected_arrival
-
-        # Convert times to minutes since midnight for comparison
-        entry_minutes = entry_time.hour * 60 + entry_time.minute
-        expected_minutes = expected_time.hour * 60 + expected_time.minute
-
-        # Calculate difference
-        minutes_late = entry_minutes - expected_minutes
-
-        # Grace period of 15 minutes
-        if minutes_late <= 15:
-            return EntryStatus.ON_TIME, 0
-        else:
-            return EntryStatus.LATE, minutes_late
+        return arrival_status(employee, entry_time, self.grace_minutes)
 
     def log_entry(self, plate_number, employee=None):
+        """Log an entry, returning None if it repeats one inside the debounce window"""
         entry_time = datetime.now()
+        if self.debouncer and not self.debouncer.should_log(plate_number, entry_time):
+            print(f"Repeated entry for {plate_number} suppressed")
+            return None
+
         status, minutes_late = self.check_arrival_status(employee, entry_time)
 
         entry = EntryLog(
@@ -126,20 +139,11 @@ class LicensePlateDetector:
         )
 
         self.session.add(entry)
-        self.session.commit()
+        self.session.flush()  # Assigns entry.id for the idempotency key
 
-        # Send notification
-        try:
-            self.notification_service.send_notification(
-                plate_number=plate_number,
-                employee_name=entry.employee_name,
-                status=status.value,
-                minutes_late=minutes_late,
-                timestamp=entry_time
-            )
-        except Exception as e:
-            print(f"Failed to send notification: {e}")
-            self.notification_service.send_error_notification(str(e))
+        # Queue the notification in the same transaction as the entry
+        self.alerts.entry(self.session, entry)
+        self.session.commit()
 
         return entry
 
@@ -149,7 +153,7 @@ class LicensePlateDetector:
             image = cv2.imread(str(image_path))
             if image is None:
                 error_msg = f"Could not read image: {image_path}"
-                self.notification_service.send_error_notification(error_msg)
+                self.notify_error(error_msg)
                 raise ValueError(error_msg)
 
             # Make a copy for drawing
@@ -174,6 +178,8 @@ class LicensePlateDetector:
                 # Find employee and log entry
                 employee = self.find_employee(plate_number)
                 entry = self.log_entry(plate_number, employee)
+                if entry is None:
+                    return None
 
                 # Set color based on status
                 color_map = {
@@ -208,10 +214,13 @@ class LicensePlateDetector:
 
         except Exception as e:
             print(f"Error processing {image_path}: {str(e)}")
-            self.notification_service.send_error_notification(f"Error processing {image_path}: {str(e)}")
+            self.notify_error(f"Error processing {image_path}: {str(e)}")
             return None
 
     def close(self):
+        self.alerts.print_report()
+        if self.debouncer:
+            self.debouncer.print_report()
         self.session.close()
 
 def process_directory(input_dir):
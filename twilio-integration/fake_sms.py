@@ -0,0 +1,37 @@
+import itertools
+import time
+
+
+class FakeSMSClient:
+    """
+    Stands in for twilio.rest.Client: client.messages.create() records the
+    message instead of sending it. Can simulate latency and failures for
+    testing the outbox sender offline.
+    """
+
+    def __init__(self, latency=0.0, fail_every=0, quiet=False):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.quiet = quiet
+        self.sent = []
+        self.calls = 0
+        self._sids = itertools.count(1)
+        self.messages = self
+
+    def create(self, body, from_, to):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.fail_every and self.calls % self.fail_every == 0:
+            raise RuntimeError(f"Simulated delivery failure to {to}")
+
+        sid = f"SMFAKE{next(self._sids):08d}"
+        self.sent.append({'sid': sid, 'body': body, 'from': from_, 'to': to})
+        if not self.quiet:
+            print(f"[fake sms] {to}: {body.strip().splitlines()[0]}")
+        return FakeMessage(sid)
+
+
+class FakeMessage:
+    def __init__(self, sid):
+        self.sid = sid
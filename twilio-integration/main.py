@@ -7,6 +7,8 @@ from setup_db import EntryLog, EntryStatus
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from notification_service import NotificationService
+from outbox import OutboxSender, create_outbox_table
+from config import TWILIO_CONFIG, NOTIFICATION_CONFIG
 
 def process_images(input_dir):
     """Process all images in the input directory"""
@@ -116,12 +118,29 @@ Invalid/Unknown: {invalid}
     finally:
         session.close()
 
+def send_notifications(batch_size=50, once=False, fake_sms=False):
+    """Deliver queued notifications from the outbox (run alongside the detector)"""
+    engine = create_engine('sqlite:///database/parking.db')
+    create_outbox_table(engine)
+
+    if fake_sms:
+        from fake_sms import FakeSMSClient
+        client = FakeSMSClient()
+    else:
+        from twilio.rest import Client
+        client = Client(TWILIO_CONFIG['account_sid'], TWILIO_CONFIG['auth_token'])
+
+    sender = OutboxSender(engine, client, TWILIO_CONFIG['from_number'], batch_size=batch_size,
+                          digest_max_lines=NOTIFICATION_CONFIG['digest_max_lines'])
+    print(f"Sending queued notifications ({sender.pending()} pending)...")
+    sender.run(once=once)
+
 def main():
     parser = argparse.ArgumentParser(description='License Plate Detection System')
     parser.add_argument('--mode', '-m',
-                       choices=['process', 'view'],
+                       choices=['process', 'view', 'send'],
                        default='process',
-                       help='Mode: process images or view recent logs')
+                       help='Mode: process images, view recent logs or send queued notifications')
     parser.add_argument('--input', '-i',
                        default='data/images',
                        help='Input directory containing images')
@@ -129,6 +148,16 @@ def main():
                        type=int,
                        default=24,
                        help='Hours of logs to view')
+    parser.add_argument('--batch-size',
+                       type=int,
+                       default=50,
+                       help='Notifications sent per outbox batch (send mode)')
+    parser.add_argument('--once',
+                       action='store_true',
+                       help='Exit once the outbox has nothing due instead of polling (send mode)')
+    parser.add_argument('--fake-sms',
+                       action='store_true',
+                       help='Print notifications instead of sending them through Twilio (send mode)')
 
     args = parser.parse_args()
 
@@ -136,6 +165,8 @@ def main():
         if args.mode == 'process':
             print(f"Processing images from: {args.input}")
             process_images(args.input)
+        elif args.mode == 'send':
+            send_notifications(args.batch_size, args.once, args.fake_sms)
         else:
             view_recent_logs(args.hours)
     except Exception as e:
@@ -1,42 +1,68 @@
-
-from twilio.rest import Client
 from datetime import datetime
 from config import TWILIO_CONFIG
 
-class NotificationService:
-    def __init__(self):
-        self.account_sid = TWILIO_CONFIG['account_sid']
-        self.auth_token = TWILIO_CONFIG['auth_token']
-        self.from_number = TWILIO_CONFIG['from_number']
-        self.to_numbers = TWILIO_CONFIG['to_numbers']
-
-        self.client = Client(self.account_sid, self.auth_token)
+def entry_message(plate_number, employee_name, status, minutes_late=None, timestamp=None, custom_message=None):
+    """SMS body for an entry (or a custom report)"""
+    timestamp = timestamp or datetime.now()
 
-    def send_notification(self, plate_number, employee_name, status, minutes_late=None, timestamp=None):
-        timestamp = timestamp or datetime.now()
-
-        # Create message based on status
-        if status == "LATE":
-            message = f"""
+    if custom_message:
+        message = custom_message
+    elif status == "LATE":
+        message = f"""
 🚨 Late Arrival Detected:
 License Plate: {plate_number}
 Employee: {employee_name}
 Minutes Late: {minutes_late}
 Time: {timestamp.strftime('%I:%M %p')}
 """
-        elif status == "ON TIME":
-            message = f"""
+    elif status == "ON TIME":
+        message = f"""
 ✅ On-Time Arrival:
 License Plate: {plate_number}
 Employee: {employee_name}
 Time: {timestamp.strftime('%I:%M %p')}
 """
-        else:
-            message = f"""
+    else:
+        message = f"""
 ⚠️ Unknown Vehicle Detected:
 License Plate: {plate_number}
 Time: {timestamp.strftime('%I:%M %p')}
 """
+    return message
+
+def error_message(error, timestamp=None):
+    """SMS body for a system error"""
+    timestamp = timestamp or datetime.now()
+    return f"""
+❌ System Error:
+{error}
+Time: {timestamp.strftime('%I:%M %p')}
+"""
+
+def digest_message(lines, window_start, window_end, max_lines=10):
+    """SMS body combining the alerts of one coalescing window"""
+    shown = lines[:max_lines]
+    more = f"\n+{len(lines) - len(shown)} more" if len(lines) > len(shown) else ""
+    return f"""
+📋 {len(lines)} alerts {window_start.strftime('%I:%M')}-{window_end.strftime('%I:%M %p')}:
+""" + "\n".join(shown) + more + "\n"
+
+class NotificationService:
+    def __init__(self, client=None):
+        self.account_sid = TWILIO_CONFIG['account_sid']
+        self.auth_token = TWILIO_CONFIG['auth_token']
+        self.from_number = TWILIO_CONFIG['from_number']
+        self.to_numbers = TWILIO_CONFIG['to_numbers']
+
+        # Any object with Twilio's client.messages.create(), e.g. FakeSMSClient
+        if client is None:
+            from twilio.rest import Client
+            client = Client(self.account_sid, self.auth_token)
+        self.client = client
+
+    def send_notification(self, plate_number, employee_name, status, minutes_late=None, timestamp=None,
+                          custom_message=None):
+        message = entry_message(plate_number, employee_name, status, minutes_late, timestamp, custom_message)
 
         # Send to all configured numbers
         for to_number in self.to_numbers:
@@ -50,12 +76,8 @@ Time: {timestamp.strftime('%I:%M %p')}
             except Exception as e:
                 print(f"Failed to send notification to {to_number}: {e}")
 
-    def send_error_notification(self, error_message):
-        message = f"""
-❌ System Error:
-{error_message}
-Time: {datetime.now().strftime('%I:%M %p')}
-"""
+    def send_error_notification(self, error):
+        message = error_message(error)
 
         for to_number in self.to_numbers:
             try:
@@ -0,0 +1,215 @@
+import enum
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import Column, Integer, String, Text, DateTime, Enum, select, update
+from sqlalchemy.orm import sessionmaker
+
+import sys
+sys.path.append('..')
+from setup_db import Base
+from notification_service import digest_message
+
+
+class OutboxStatus(enum.Enum):
+    PENDING = "PENDING"
+    SENDING = "SENDING"
+    SENT = "SENT"
+    FAILED = "FAILED"
+
+
+class OutboxMessage(Base):
+    """One SMS to one recipient, waiting for (or done with) delivery"""
+    __tablename__ = 'notification_outbox'
+
+    id = Column(Integer, primary_key=True)
+    # "<event>:<recipient>", so the same event can never be queued twice
+    idempotency_key = Column(String(100), unique=True, nullable=False)
+    to_number = Column(String(20), nullable=False)
+    body = Column(Text, nullable=False)
+    # 'message' is sent as is; 'digest' rows due together are combined into
+    # one SMS per recipient, listing each row's summary line
+    kind = Column(String(10), nullable=False, default='message')
+    summary = Column(String(200), nullable=True)
+    signature = Column(String(64), nullable=True, index=True)
+    occurrences = Column(Integer, nullable=False, default=1)
+    status = Column(Enum(OutboxStatus), nullable=False, default=OutboxStatus.PENDING, index=True)
+    attempts = Column(Integer, nullable=False, default=0)
+    next_attempt_at = Column(DateTime, nullable=False, default=datetime.now)
+    claimed_at = Column(DateTime, nullable=True)
+    created_at = Column(DateTime, nullable=False, default=datetime.now)
+    sent_at = Column(DateTime, nullable=True)
+    provider_id = Column(String(64), nullable=True)
+    last_error = Column(Text, nullable=True)
+
+
+def create_outbox_table(engine):
+    OutboxMessage.__table__.create(engine, checkfirst=True)
+
+
+def enqueue(session, key, body, to_numbers, now=None, due=None, **fields):
+    """
+    Queue `body` for every recipient in the caller's session, to be sent at
+    `due` (default now). Nothing is committed here: commit together with the
+    row the message is about, so both are saved or neither is. Keys already
+    queued are skipped. Extra `fields` (kind, summary, signature) are set on
+    every row.
+    """
+    now = now or datetime.now()
+    keys = {f"{key}:{to_number}": to_number for to_number in to_numbers}
+    existing = set(session.scalars(
+        select(OutboxMessage.idempotency_key).where(OutboxMessage.idempotency_key.in_(keys))
+    ))
+    for idempotency_key, to_number in keys.items():
+        if idempotency_key not in existing:
+            session.add(OutboxMessage(idempotency_key=idempotency_key, to_number=to_number, body=body,
+                                      status=OutboxStatus.PENDING, attempts=0, occurrences=1,
+                                      next_attempt_at=due or now, created_at=now, **fields))
+
+
+class OutboxSender:
+    """
+    Drains the notification outbox, normally in its own process.
+
+    Each round claims a batch of due PENDING messages (marking them SENDING
+    in a short transaction), sends them with no transaction open, and
+    records the outcome. Failed sends are retried with exponential backoff
+    until `max_attempts`, then marked FAILED. Messages left SENDING by a
+    sender that died mid-batch are reclaimed after `lease_seconds`; as the
+    provider cannot be asked whether those went out, delivery is
+    at-least-once for that case only.
+
+    Digest rows due at the same time are sent as one SMS per recipient and
+    share its outcome.
+    """
+
+    def __init__(self, engine, client, from_number, batch_size=50, max_attempts=5,
+                 retry_seconds=30, lease_seconds=300, digest_max_lines=10):
+        self.Session = sessionmaker(bind=engine)
+        self.client = client
+        self.from_number = from_number
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_seconds = retry_seconds
+        self.lease = timedelta(seconds=lease_seconds)
+        self.digest_max_lines = digest_max_lines
+        self.stats = {'sent': 0, 'retried': 0, 'failed': 0, 'reclaimed': 0, 'api_calls': 0}
+
+    def claim(self, now=None):
+        """Mark a batch of due messages SENDING and return them"""
+        now = now or datetime.now()
+        with self.Session.begin() as session:
+            reclaimed = session.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.status == OutboxStatus.SENDING,
+                       OutboxMessage.claimed_at < now - self.lease)
+                .values(status=OutboxStatus.PENDING)
+            ).rowcount
+            self.stats['reclaimed'] += reclaimed
+
+            due = select(OutboxMessage.id).where(OutboxMessage.status == OutboxStatus.PENDING,
+                                                 OutboxMessage.next_attempt_at <= now)
+            ids = list(session.scalars(
+                due.where(OutboxMessage.kind != 'digest')
+                .order_by(OutboxMessage.next_attempt_at, OutboxMessage.id)
+                .limit(self.batch_size)
+            ))
+            # All due digest rows, however many: they collapse to one SMS per recipient
+            ids += session.scalars(due.where(OutboxMessage.kind == 'digest'))
+            if not ids:
+                return []
+
+            # Guarded on status so a concurrent sender cannot claim the same rows
+            session.execute(
+                update(OutboxMessage)
+                .where(OutboxMessage.id.in_(ids), OutboxMessage.status == OutboxStatus.PENDING)
+                .values(status=OutboxStatus.SENDING, claimed_at=now)
+            )
+            messages = session.scalars(
+                select(OutboxMessage).where(OutboxMessage.id.in_(ids), OutboxMessage.claimed_at == now)
+            ).all()
+            session.expunge_all()
+        return messages
+
+    def deliveries(self, messages):
+        """Group claimed rows into SMS to send: [(rows, to_number, body)]"""
+        deliveries = []
+        digests = {}
+        for message in messages:
+            if message.kind == 'digest':
+                # Rows of one window share their due time
+                digests.setdefault((message.to_number, message.next_attempt_at), []).append(message)
+            else:
+                deliveries.append(([message], message.to_number, message.body))
+
+        for (to_number, _), rows in digests.items():
+            if len(rows) == 1 and rows[0].occurrences == 1:
+                deliveries.append((rows, to_number, rows[0].body))
+                continue
+            lines = [row.summary + (f" (x{row.occurrences})" if row.occurrences > 1 else "") for row in rows]
+            body = digest_message(lines, min(row.created_at for row in rows), max(row.created_at for row in rows),
+                                  self.digest_max_lines)
+            deliveries.append((rows, to_number, body))
+        return deliveries
+
+    def deliver(self, to_number, body):
+        """Send one SMS. Returns (provider_id, error)"""
+        self.stats['api_calls'] += 1
+        try:
+            result = self.client.messages.create(body=body, from_=self.from_number, to=to_number)
+            return getattr(result, 'sid', None), None
+        except Exception as e:
+            return None, str(e)
+
+    def send_batch(self, now=None):
+        """Claim, send and record one batch. Returns the number of messages attempted"""
+        messages = self.claim(now)
+        outcomes = []
+        for rows, to_number, body in self.deliveries(messages):
+            provider_id, error = self.deliver(to_number, body)
+            outcomes.extend((message, provider_id, error) for message in rows)
+
+        now = datetime.now()
+        with self.Session.begin() as session:
+            for message, provider_id, error in outcomes:
+                attempts = message.attempts + 1
+                values = {'attempts': attempts, 'claimed_at': None}
+                if error is None:
+                    values.update(status=OutboxStatus.SENT, sent_at=now, provider_id=provider_id, last_error=None)
+                    self.stats['sent'] += 1
+                elif attempts >= self.max_attempts:
+                    values.update(status=OutboxStatus.FAILED, last_error=error)
+                    self.stats['failed'] += 1
+                    print(f"Giving up on {message.idempotency_key} after {attempts} attempts: {error}")
+                else:
+                    delay = self.retry_seconds * 2 ** (attempts - 1)
+                    values.update(status=OutboxStatus.PENDING, last_error=error,
+                                  next_attempt_at=now + timedelta(seconds=delay))
+                    self.stats['retried'] += 1
+                    print(f"Send of {message.idempotency_key} failed ({error}), retrying in {delay}s")
+                session.execute(update(OutboxMessage).where(OutboxMessage.id == message.id).values(**values))
+        return len(messages)
+
+    def run(self, poll_seconds=2.0, once=False):
+        """Send until interrupted, or until the outbox has nothing due if `once`"""
+        try:
+            while True:
+                attempted = self.send_batch()
+                if attempted:
+                    continue
+                if once:
+                    break
+                time.sleep(poll_seconds)
+        except KeyboardInterrupt:
+            pass
+        self.print_report()
+
+    def pending(self):
+        with self.Session() as session:
+            return session.query(OutboxMessage).filter(
+                OutboxMessage.status.in_([OutboxStatus.PENDING, OutboxStatus.SENDING])
+            ).count()
+
+    def print_report(self):
+        print(f"\nOutbox: {self.stats['sent']} sent in {self.stats['api_calls']} API calls, "
+              f"{self.stats['retried']} retries scheduled, {self.stats['failed']} failed, "
+              f"{self.stats['reclaimed']} reclaimed, {self.pending()} still queued")